@@ -0,0 +1,94 @@
+# benchmark-table-rows.py
+"""
+표 DataFrame → 저장용 행 변환 벤치마크 (iterrows 방식 vs table_rows 컬럼 연산)
+
+실행: python benchmark-table-rows.py [행 수] [반복 횟수]
+"""
+
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from table_rows import TABLE_COLUMNS, table_rows_from_frame
+
+
+# 컬럼별 빈 칸(NaN) 비율
+MISSING_RATES = {'NO': 0.05, 'CATEGORY': 0.05, 'DEPTH 2': 0.25, 'DEPTH 3': 0.3, 'PRE-CONDITION': 0.3}
+
+
+def make_frame(n_rows, seed=0):
+    """CSV 업로드와 비슷한 표 (빈 문자열, 공백, 실제 NaN 칸, 실수형 NO 섞임)"""
+    rng = np.random.default_rng(seed)
+    frame = pd.DataFrame({
+        'NO': np.arange(1, n_rows + 1, dtype=float),
+        'CATEGORY': rng.choice(['쿠폰', '구매평', '주문', '', ' '], n_rows, p=[0.3, 0.3, 0.3, 0.05, 0.05]),
+        'DEPTH 1': rng.choice(['BO', 'FO', 'API', ''], n_rows, p=[0.4, 0.4, 0.15, 0.05]),
+        'DEPTH 2': rng.choice(['목록', '상세', '설정'], n_rows),
+        'DEPTH 3': rng.choice(['필터', '정렬'], n_rows),
+        'PRE-CONDITION': rng.choice(['로그인 상태', '비회원'], n_rows),
+        'STEP': [f"{i}. 버튼 클릭 후 결과 확인" for i in range(n_rows)],
+        'EXPECT RESULT': rng.choice(['정상 노출', '오류 메시지 노출', '이동'], n_rows),
+    })
+    # 문자열 후보에 np.nan을 섞으면 'nan' 문자열이 되므로 칸을 직접 비움
+    for column, rate in MISSING_RATES.items():
+        frame.loc[rng.random(n_rows) < rate, column] = np.nan
+    return frame
+
+
+def _cell(value):
+    """table_rows와 같은 규칙으로 한 칸 정리 (NaN → '', 1.0 → '1')"""
+    if pd.isna(value):
+        return ''
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+def iterrows_rows(edited_df):
+    """
+    한 행씩 변환 (table_rows 도입 전 방식, 정리 규칙은 table_rows와 동일하게 맞춤)
+    - 예전 저장 코드는 NO를 '2.0', 빈 칸을 'nan'으로 저장했음 → 결과 비교를 위해 규칙만 맞춘 버전
+    """
+    table_data = []
+    for index, row in edited_df.iterrows():
+        cleaned = {column: _cell(row[column]) for column in TABLE_COLUMNS}
+        if not cleaned['CATEGORY'].strip() or not cleaned['DEPTH 1'].strip():
+            continue
+        table_data.append(cleaned)
+    return table_data
+
+
+def best_of(fn, frame, repeat):
+    """repeat회 실행 중 가장 빠른 시간 (초)과 결과"""
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn(frame)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+if __name__ == "__main__":
+    n_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+
+    frame = make_frame(n_rows)[TABLE_COLUMNS]
+
+    old_seconds, old_rows = best_of(iterrows_rows, frame, repeat)
+    new_seconds, new_rows = best_of(table_rows_from_frame, frame, repeat)
+    _, positional_rows = best_of(lambda df: table_rows_from_frame(df, keep_positions=True), frame, 1)
+
+    # 행 수뿐 아니라 내용까지 같은지 확인
+    assert old_rows == new_rows, next(
+        (f"{i}번째 행이 다릅니다: {a} != {b}" for i, (a, b) in enumerate(zip(old_rows, new_rows)) if a != b),
+        f"행 수가 다릅니다: {len(old_rows)} != {len(new_rows)}"
+    )
+
+    print(f"행 수: {n_rows:,} (반복 {repeat}회 중 최솟값)")
+    print(f"iterrows:      {old_seconds * 1000:8.1f} ms  → {len(old_rows):,}행")
+    print(f"table_rows:    {new_seconds * 1000:8.1f} ms  → {len(new_rows):,}행")
+    print(f"속도 향상:     {old_seconds / new_seconds:8.1f}배 (두 방식 결과 동일)")
+    print(f"위치 유지 모드: 삭제 대상(None) {sum(1 for row in positional_rows if row is None):,}행")
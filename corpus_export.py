@@ -0,0 +1,129 @@
+# corpus_export.py
+"""
+전체 데이터(test_cases / spec_docs) 내보내기 - Parquet 또는 JSONL
+- 페이지 단위로 받은 행을 바로 파일에 기록 (메모리에는 한 페이지만 유지)
+- 임베딩은 선택 사항 (float32 배열)
+- 백업, 오프라인 분석, 로컬 인덱스 초기 데이터용
+"""
+
+import gzip
+import json
+import os
+import time
+
+from vector_index import parse_embedding
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PARQUET_AVAILABLE = True
+except ImportError:
+    PARQUET_AVAILABLE = False
+
+EXPORT_FORMATS = ('parquet', 'jsonl')
+
+
+def _text(value):
+    """문자열 컬럼 값 (dict/list는 JSON 문자열)"""
+    if value is None:
+        return None
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, ensure_ascii=False)
+    return str(value)
+
+
+def _parquet_schema(columns):
+    """id는 int64, embedding은 float32 리스트, 나머지는 문자열"""
+    fields = []
+    for column in columns:
+        if column == 'id':
+            fields.append(pa.field(column, pa.int64()))
+        elif column == 'embedding':
+            fields.append(pa.field(column, pa.list_(pa.float32())))
+        else:
+            fields.append(pa.field(column, pa.string()))
+    return pa.schema(fields)
+
+
+def _parquet_batch(page, columns, schema):
+    """페이지 → Arrow 레코드 배치"""
+    arrays = []
+    for column in columns:
+        values = [row.get(column) for row in page]
+        if column == 'embedding':
+            arrays.append(pa.array(
+                [parse_embedding(value) if value else None for value in values],
+                type=pa.list_(pa.float32())
+            ))
+        elif column == 'id':
+            arrays.append(pa.array(values, type=pa.int64()))
+        else:
+            arrays.append(pa.array([_text(value) for value in values], type=pa.string()))
+    return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+
+def _jsonl_line(row, columns):
+    """행 → JSON 한 줄 (embedding은 float32 정밀도 숫자 리스트)"""
+    record = {}
+    for column in columns:
+        value = row.get(column)
+        if column == 'embedding' and value:
+            # float32 최단 표기 (0.1 → 0.1, 0.10000000149011612 아님)
+            value = [float(x) for x in parse_embedding(value).astype(str)]
+        record[column] = value
+    return json.dumps(record, ensure_ascii=False) + "\n"
+
+
+def export_pages(pages, columns, path, fmt='parquet', on_page=None):
+    """
+    페이지 iterable을 파일로 기록
+
+    Args:
+        pages (iterable): 행(dict) 리스트의 iterable
+        columns (list): 기록할 컬럼 ('embedding'이 있으면 float32 배열로 기록)
+        path (str): 저장 경로 (jsonl은 .gz로 끝나면 gzip 압축)
+        fmt (str): 'parquet' (zstd 압축) 또는 'jsonl'
+        on_page (callable): 페이지 기록 후 호출 (누적 행 수)
+
+    Returns:
+        dict: {"path", "rows", "bytes", "seconds", "rows_per_sec", "mb_per_sec"}
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"지원하지 않는 형식: {fmt}")
+    if fmt == 'parquet' and not PARQUET_AVAILABLE:
+        raise ImportError("Parquet로 내보내려면 pyarrow가 필요합니다: pip install pyarrow")
+
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    started = time.perf_counter()
+    rows = 0
+
+    if fmt == 'parquet':
+        schema = _parquet_schema(columns)
+        with pq.ParquetWriter(path, schema, compression='zstd') as writer:
+            for page in pages:
+                writer.write_batch(_parquet_batch(page, columns, schema))
+                rows += len(page)
+                if on_page:
+                    on_page(rows)
+    else:
+        opener = gzip.open if path.endswith('.gz') else open
+        with opener(path, 'wt', encoding='utf-8') as f:
+            for page in pages:
+                f.writelines(_jsonl_line(row, columns) for row in page)
+                rows += len(page)
+                if on_page:
+                    on_page(rows)
+
+    seconds = time.perf_counter() - started
+    size = os.path.getsize(path)
+    return {
+        "path": path,
+        "rows": rows,
+        "bytes": size,
+        "seconds": seconds,
+        "rows_per_sec": rows / seconds if seconds else 0.0,
+        "mb_per_sec": size / 1024 / 1024 / seconds if seconds else 0.0
+    }
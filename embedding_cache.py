@@ -0,0 +1,170 @@
+# embedding_cache.py
+"""
+임베딩 캐시
+- EmbeddingCache: 문서 임베딩 (내용 해시 기반, 메모리 LRU + 로컬 SQLite 파일)
+- QueryEmbeddingCache: 검색어 임베딩 (정규화된 검색어 기반, 메모리 LRU + TTL)
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from array import array
+from collections import OrderedDict
+
+
+class EmbeddingCache:
+    """
+    (모델, task_type, sha256(텍스트)) 키로 임베딩 벡터를 저장하는 캐시
+
+    Args:
+        db_path (str): SQLite 파일 경로 (None이면 메모리 LRU만 사용)
+        max_memory_items (int): 메모리 LRU 최대 항목 수
+    """
+
+    def __init__(self, db_path=None, max_memory_items=5000):
+        self.max_memory_items = max_memory_items
+        self.hits = 0
+        self.misses = 0
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+
+        if db_path:
+            directory = os.path.dirname(db_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings ("
+                "model TEXT NOT NULL, "
+                "task_type TEXT NOT NULL, "
+                "text_hash TEXT NOT NULL, "
+                "vector BLOB NOT NULL, "
+                "PRIMARY KEY (model, task_type, text_hash))"
+            )
+            self._db.commit()
+
+    @staticmethod
+    def make_key(model, task_type, text):
+        """캐시 키 생성: (모델, task_type, sha256(텍스트))"""
+        text_hash = hashlib.sha256(text.encode('utf-8')).hexdigest()
+        return (model, task_type, text_hash)
+
+    def get(self, model, task_type, text):
+        """캐시 조회 (없으면 None)"""
+        key = self.make_key(model, task_type, text)
+
+        with self._lock:
+            # 1. 메모리 LRU
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return self._memory[key]
+
+            # 2. SQLite
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT vector FROM embeddings WHERE model = ? AND task_type = ? AND text_hash = ?",
+                    key
+                ).fetchone()
+                if row:
+                    vector = array('f', row[0]).tolist()
+                    self._remember(key, vector)
+                    self.hits += 1
+                    return vector
+
+            self.misses += 1
+            return None
+
+    def set(self, model, task_type, text, vector):
+        """캐시 저장 (메모리 + SQLite)"""
+        key = self.make_key(model, task_type, text)
+
+        with self._lock:
+            self._remember(key, list(vector))
+
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO embeddings (model, task_type, text_hash, vector) VALUES (?, ?, ?, ?)",
+                    key + (array('f', vector).tobytes(),)
+                )
+                self._db.commit()
+
+    def stats(self):
+        """히트/미스 통계"""
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "memory_items": len(self._memory)
+        }
+
+    def _remember(self, key, vector):
+        """메모리 LRU에 추가 (초과 시 가장 오래된 항목 제거)"""
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_items:
+            self._memory.popitem(last=False)
+
+
+class QueryEmbeddingCache:
+    """
+    검색어 임베딩 캐시 (메모리 LRU + TTL)
+    - 공백/대소문자만 다른 검색어는 같은 키로 취급
+
+    Args:
+        max_items (int): 최대 항목 수
+        ttl_seconds (int): 항목 유효 시간 (초)
+    """
+
+    def __init__(self, max_items=1000, ttl_seconds=3600):
+        self.max_items = max_items
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._items = OrderedDict()  # 키 → (저장 시각, 벡터)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def normalize(query):
+        """공백 정리 + 소문자 변환"""
+        return " ".join(query.split()).lower()
+
+    def get(self, model, query):
+        """캐시 조회 (없거나 만료되면 None)"""
+        key = (model, self.normalize(query))
+
+        with self._lock:
+            item = self._items.get(key)
+            if item and time.monotonic() - item[0] < self.ttl_seconds:
+                self._items.move_to_end(key)
+                self.hits += 1
+                return item[1]
+
+            if item:
+                del self._items[key]  # 만료
+            self.misses += 1
+            return None
+
+    def set(self, model, query, vector):
+        """캐시 저장 (초과 시 가장 오래된 항목 제거)"""
+        key = (model, self.normalize(query))
+
+        with self._lock:
+            self._items[key] = (time.monotonic(), list(vector))
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_items:
+                self._items.popitem(last=False)
+
+    def stats(self):
+        """히트/미스 통계"""
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "items": len(self._items)
+        }
@@ -0,0 +1,99 @@
+# excel_export.py
+"""
+Excel(xlsx) 내보내기 (openpyxl write-only 모드)
+- 행을 받는 즉시 파일에 기록 → 전체 테이블도 메모리에 워크북을 통째로 만들지 않음
+- 헤더/본문 스타일은 named style로 한 번만 등록하고 셀마다 이름으로 재사용
+"""
+
+from io import BytesIO
+
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.cell.cell import ILLEGAL_CHARACTERS_RE
+from openpyxl.styles import Alignment, Font, NamedStyle, PatternFill
+from openpyxl.utils import get_column_letter
+
+# 표 형식 테스트 케이스 열 너비 (NO ~ EXPECT RESULT)
+TEST_CASE_COLUMN_WIDTHS = [5, 15, 15, 20, 20, 30, 40, 40]
+
+# 줄바꿈해서 보여줄 긴 텍스트 열
+WRAP_COLUMNS = ('PRE-CONDITION', 'STEP', 'EXPECT RESULT', 'DESCRIPTION', 'CONTENT')
+
+
+def _named_styles():
+    """헤더 / 줄바꿈 본문 스타일"""
+    header = NamedStyle(name="tc_header")
+    header.fill = PatternFill(start_color='4A90A4', end_color='4A90A4', fill_type='solid')
+    header.font = Font(bold=True, color='FFFFFF')
+    header.alignment = Alignment(horizontal='center', vertical='center', wrap_text=True)
+
+    wrapped = NamedStyle(name="tc_wrap")
+    wrapped.alignment = Alignment(vertical='top', wrap_text=True)
+    return header, wrapped
+
+
+def _cell_value(value):
+    """xlsx에 쓸 수 없는 값 정리 (None → '', dict/list → 문자열, 제어 문자 제거)"""
+    if value is None:
+        return ''
+    if isinstance(value, (dict, list)):
+        value = str(value)
+    if isinstance(value, str):
+        return ILLEGAL_CHARACTERS_RE.sub('', value)
+    return value
+
+
+def write_xlsx(chunks, columns, output=None, sheet_name='테스트케이스', widths=None):
+    """
+    행 묶음을 받는 대로 xlsx 시트에 기록
+
+    Args:
+        chunks (iterable): 행(dict) 리스트의 iterable (페이지 단위 조회 결과를 그대로 넘기면 됨)
+        columns (list): 열 순서 (행 dict의 키)
+        output: 저장할 파일 경로 또는 파일 객체 (None이면 BytesIO 생성)
+        sheet_name (str): 시트 이름
+        widths (list): 열 너비 (None이면 기본 20)
+
+    Returns:
+        tuple: (output, 기록한 행 수) - BytesIO면 처음 위치로 되돌려서 반환
+    """
+    output = output if output is not None else BytesIO()
+
+    workbook = Workbook(write_only=True)
+    header_style, wrap_style = _named_styles()
+    workbook.add_named_style(header_style)
+    workbook.add_named_style(wrap_style)
+
+    sheet = workbook.create_sheet(sheet_name)
+    for idx, column in enumerate(columns, 1):
+        width = widths[idx - 1] if widths and idx <= len(widths) else 20
+        sheet.column_dimensions[get_column_letter(idx)].width = width
+    sheet.freeze_panes = 'A2'
+
+    header = []
+    for column in columns:
+        cell = WriteOnlyCell(sheet, value=column)
+        cell.style = "tc_header"
+        header.append(cell)
+    sheet.append(header)
+
+    wrap_flags = [column in WRAP_COLUMNS for column in columns]
+    written = 0
+    for chunk in chunks:
+        for row in chunk:
+            values = []
+            for column, wrap in zip(columns, wrap_flags):
+                value = _cell_value(row.get(column))
+                if wrap and value:
+                    cell = WriteOnlyCell(sheet, value=value)
+                    cell.style = "tc_wrap"
+                    values.append(cell)
+                else:
+                    values.append(value)
+            sheet.append(values)
+            written += 1
+
+    workbook.save(output)
+    if hasattr(output, 'seek'):
+        output.seek(0)
+    return output, written
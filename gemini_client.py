@@ -0,0 +1,226 @@
+# gemini_client.py
+"""
+모든 Gemini 호출이 거치는 공용 클라이언트
+- 토큰 버킷 속도 제한 (생성/임베딩 별도)
+- 재시도 가능한 오류(429, 5xx, 타임아웃)는 지수 백오프 + 지터로 재시도
+- 호출별 타임아웃, 동시 호출 수 제한
+- 호출/재시도/실패/대기 시간 지표
+"""
+
+import os
+import random
+import threading
+import time
+
+import google.generativeai as genai
+
+# 재시도할 HTTP 상태 코드 (google.api_core 예외의 code 값)
+RETRYABLE_CODES = (408, 429, 500, 502, 503, 504)
+
+
+def is_retryable(error):
+    """재시도하면 성공할 수 있는 오류인지 판단"""
+    if isinstance(error, (TimeoutError, ConnectionError)):
+        return True
+    code = getattr(error, 'code', None)
+    if isinstance(code, int):
+        return code in RETRYABLE_CODES
+    message = str(error).lower()
+    return any(keyword in message for keyword in ("429", "quota", "rate limit", "unavailable", "deadline"))
+
+
+class TokenBucket:
+    """
+    토큰 버킷 속도 제한
+
+    Args:
+        rate_per_minute (float): 분당 허용 요청 수
+        capacity (int): 한 번에 몰아서 보낼 수 있는 최대 요청 수 (None이면 분당 요청 수의 1/6)
+    """
+
+    def __init__(self, rate_per_minute, capacity=None):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity or max(1, int(rate_per_minute / 6))
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """
+        토큰 1개 사용 (없으면 채워질 때까지 대기)
+
+        Returns:
+            float: 대기한 시간 (초)
+        """
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return waited
+                delay = (1 - self.tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+
+class GeminiClient:
+    """
+    속도 제한 + 재시도 + 지표가 적용된 Gemini 클라이언트 (모든 세션/스레드 공유)
+
+    Args:
+        generate_rpm (float): 생성 분당 요청 수
+        embed_rpm (float): 임베딩 분당 요청 수
+        max_concurrency (int): 동시 호출 수
+        max_retries (int): 최대 재시도 횟수
+        base_delay (float): 첫 재시도 대기 시간 (초)
+        max_delay (float): 재시도 대기 시간 상한 (초)
+        generate_timeout (float): 생성 호출 타임아웃 (초)
+        embed_timeout (float): 임베딩 호출 타임아웃 (초)
+    """
+
+    def __init__(
+        self,
+        generate_rpm=60,
+        embed_rpm=600,
+        max_concurrency=4,
+        max_retries=4,
+        base_delay=1.0,
+        max_delay=30.0,
+        generate_timeout=300,
+        embed_timeout=30
+    ):
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.timeouts = {"generate": generate_timeout, "embed": embed_timeout}
+        self._buckets = {"generate": TokenBucket(generate_rpm), "embed": TokenBucket(embed_rpm)}
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self._lock = threading.Lock()
+        self._metrics = {
+            operation: {
+                "calls": 0,
+                "successes": 0,
+                "failures": 0,
+                "retries": 0,
+                "throttled_seconds": 0.0,
+                "latency_seconds": 0.0,
+                "last_error": None
+            }
+            for operation in self._buckets
+        }
+
+    @classmethod
+    def from_env(cls):
+        """환경 변수 설정으로 생성"""
+        return cls(
+            generate_rpm=float(os.environ.get("GEMINI_GENERATE_RPM", "60")),
+            embed_rpm=float(os.environ.get("GEMINI_EMBED_RPM", "600")),
+            max_concurrency=int(os.environ.get("GEMINI_MAX_CONCURRENCY", "4")),
+            max_retries=int(os.environ.get("GEMINI_MAX_RETRIES", "4")),
+            generate_timeout=float(os.environ.get("GEMINI_GENERATE_TIMEOUT", "300")),
+            embed_timeout=float(os.environ.get("GEMINI_EMBED_TIMEOUT", "30"))
+        )
+
+    def model(self, model_name):
+        """이 클라이언트를 거치는 생성 모델"""
+        return GeminiModel(self, model_name)
+
+    def embed_content(self, **kwargs):
+        """genai.embed_content 호출 (인자 동일)"""
+        return self.call("embed", genai.embed_content, **kwargs)
+
+    def call(self, operation, fn, *args, stream=False, **kwargs):
+        """
+        속도 제한 + 동시 호출 제한 + 재시도로 fn 호출
+
+        Args:
+            operation (str): 'generate' 또는 'embed'
+            fn (callable): 실제 API 호출 함수
+            stream (bool): 스트리밍 응답이면 끝까지 읽을 때까지 동시 호출 슬롯 유지
+        """
+        kwargs.setdefault("request_options", {"timeout": self.timeouts[operation]})
+        if stream:
+            kwargs["stream"] = True
+        self._record(operation, calls=1)
+
+        for attempt in range(self.max_retries + 1):
+            self._record(operation, throttled_seconds=self._buckets[operation].acquire())
+            self._slots.acquire()
+            started = time.monotonic()
+            try:
+                response = fn(*args, **kwargs)
+            except Exception as e:
+                self._slots.release()
+                self._record(operation, last_error=str(e))
+                if attempt >= self.max_retries or not is_retryable(e):
+                    self._record(operation, failures=1)
+                    raise
+                self._record(operation, retries=1)
+                # 지수 백오프 + 전체 지터
+                time.sleep(random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt)))
+                continue
+
+            if stream:
+                return self._stream(operation, response, started)
+
+            self._slots.release()
+            self._record(operation, successes=1, latency_seconds=time.monotonic() - started)
+            return response
+
+    def _stream(self, operation, response, started):
+        """스트리밍 응답을 다 읽을 때까지 슬롯을 잡고 있는 제너레이터"""
+        try:
+            for chunk in response:
+                yield chunk
+            self._record(operation, successes=1, latency_seconds=time.monotonic() - started)
+        except Exception as e:
+            self._record(operation, failures=1, last_error=str(e))
+            raise
+        finally:
+            self._slots.release()
+
+    def _record(self, operation, last_error=None, **counters):
+        """지표 갱신"""
+        with self._lock:
+            metrics = self._metrics[operation]
+            for name, value in counters.items():
+                metrics[name] += value
+            if last_error is not None:
+                metrics["last_error"] = last_error
+
+    def stats(self):
+        """작업별 지표 (성공 호출 평균 응답 시간 포함)"""
+        with self._lock:
+            stats = {operation: dict(metrics) for operation, metrics in self._metrics.items()}
+        for metrics in stats.values():
+            successes = metrics["successes"]
+            metrics["avg_latency_seconds"] = metrics["latency_seconds"] / successes if successes else 0.0
+        return stats
+
+
+class GeminiModel:
+    """
+    GeminiClient를 거치는 GenerativeModel (generate_content / model_name만 사용)
+
+    Args:
+        client (GeminiClient): 공용 클라이언트
+        model_name (str): 모델 이름
+    """
+
+    def __init__(self, client, model_name):
+        self.client = client
+        self._model = genai.GenerativeModel(model_name)
+        self.model_name = self._model.model_name
+
+    def generate_content(self, prompt, generation_config=None, stream=False):
+        """generate_content 호출 (stream=True면 조각을 순서대로 내주는 제너레이터 반환)"""
+        return self.client.call(
+            "generate",
+            self._model.generate_content,
+            prompt,
+            generation_config=generation_config,
+            stream=stream
+        )
@@ -0,0 +1,601 @@
+# gemini_helpers.py
+"""
+Gemini 생성 관련 헬퍼 함수 (프롬프트 구성, 응답 처리)
+"""
+
+import json
+import math
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+# 프롬프트 템플릿 버전 (템플릿을 바꾸면 올릴 것 → 이전 결과 캐시 무효화)
+PROMPT_TEMPLATE_VERSION = 1
+
+# 프롬프트 학습 데이터 토큰 예산 (테스트 케이스 + 기획 문서)
+PROMPT_TOKEN_BUDGET = int(os.environ.get("PROMPT_TOKEN_BUDGET", "24000"))
+
+# =============================================
+# 1. 스트리밍 응답 처리
+# =============================================
+
+def stream_text(response):
+    """
+    스트리밍 응답에서 텍스트 조각만 순서대로 꺼냄
+    (텍스트가 없는 조각은 건너뜀)
+    """
+    for chunk in response:
+        try:
+            text = chunk.text
+        except ValueError:
+            continue
+        if text:
+            yield text
+
+
+class StreamingCaseParser:
+    """
+    스트리밍 중인 JSON 응답에서 배열 항목을 완성되는 즉시 꺼내는 파서
+    (전체 응답을 기다리지 않고 new_test_cases의 각 케이스를 바로 사용)
+
+    Args:
+        key (str): 대상 배열 키
+    """
+
+    def __init__(self, key="new_test_cases"):
+        self.key_pattern = re.compile(r'"%s"\s*:\s*\[' % re.escape(key))
+        self.buffer = ""
+        self.pos = None  # 배열 내부 스캔 위치 (None이면 배열 시작 전)
+        self.depth = 0
+        self.start = None
+        self.in_string = False
+        self.escape = False
+        self.done = False
+
+    def feed(self, text):
+        """
+        텍스트 조각 추가
+
+        Returns:
+            list: 이번 조각으로 새로 완성된 항목 리스트
+        """
+        self.buffer += text
+        if self.done:
+            return []
+
+        if self.pos is None:
+            match = self.key_pattern.search(self.buffer)
+            if not match:
+                return []
+            self.pos = match.end()
+
+        items = []
+        while self.pos < len(self.buffer):
+            ch = self.buffer[self.pos]
+
+            if self.in_string:
+                if self.escape:
+                    self.escape = False
+                elif ch == '\\':
+                    self.escape = True
+                elif ch == '"':
+                    self.in_string = False
+            elif ch == '"':
+                self.in_string = True
+            elif ch in '{[':
+                if self.depth == 0 and ch == '{':
+                    self.start = self.pos
+                self.depth += 1
+            elif ch in '}]':
+                if self.depth == 0:
+                    # 배열 종료
+                    self.done = True
+                    break
+                self.depth -= 1
+                if self.depth == 0 and self.start is not None:
+                    try:
+                        items.append(json.loads(self.buffer[self.start:self.pos + 1], strict=False))
+                    except json.JSONDecodeError:
+                        pass
+                    self.start = None
+
+            self.pos += 1
+
+        return items
+
+# =============================================
+# 1-1. 구조화된 JSON 응답 (스키마 지정 + 검증 + 부분 복구)
+# =============================================
+
+# 추천 응답 스키마 (Gemini response_schema 형식)
+NEW_TEST_CASE_FIELDS = ['category', 'depth1', 'depth2', 'depth3', 'pre_condition', 'step', 'expect_result']
+RESPONSE_TEXT_FIELDS = ['reasoning', 'test_order', 'additional_suggestions']
+
+RECOMMENDATION_SCHEMA = {
+    "type": "OBJECT",
+    "properties": {
+        "reasoning": {"type": "STRING"},
+        "existing_test_cases": {
+            "type": "ARRAY",
+            "items": {
+                "type": "OBJECT",
+                "properties": {
+                    "id": {"type": "INTEGER"},
+                    "reason": {"type": "STRING"}
+                },
+                "required": ["id", "reason"]
+            }
+        },
+        "new_test_cases": {
+            "type": "ARRAY",
+            "items": {
+                "type": "OBJECT",
+                "properties": {
+                    "no": {"type": "INTEGER"},
+                    **{field: {"type": "STRING"} for field in NEW_TEST_CASE_FIELDS}
+                },
+                "required": ["no"] + NEW_TEST_CASE_FIELDS
+            }
+        },
+        "test_order": {"type": "STRING"},
+        "additional_suggestions": {"type": "STRING"}
+    },
+    "required": ["reasoning", "existing_test_cases", "new_test_cases", "test_order", "additional_suggestions"]
+}
+
+# JSON 모드 생성 설정 (스키마에 맞는 JSON만 생성)
+STRUCTURED_GENERATION_CONFIG = {
+    "response_mime_type": "application/json",
+    "response_schema": RECOMMENDATION_SCHEMA
+}
+
+def validate_recommendation(response):
+    """
+    스키마 기준으로 응답 검증 + 보정 (잘못된 항목만 보정/제외)
+    
+    Returns:
+        tuple: (보정된 응답 dict, 문제 목록)
+    """
+    issues = []
+    result = {}
+    
+    for field in RESPONSE_TEXT_FIELDS:
+        value = response.get(field)
+        if not isinstance(value, str):
+            if value is not None:
+                issues.append(f"{field}: 문자열이 아님")
+            value = "" if value is None else str(value)
+        result[field] = value
+    
+    existing = []
+    for idx, item in enumerate(response.get('existing_test_cases') or [], 1):
+        if not isinstance(item, dict) or 'id' not in item:
+            issues.append(f"existing_test_cases {idx}번째: id 없음 → 제외")
+            continue
+        rec_id = item['id']
+        if isinstance(rec_id, str) and rec_id.strip().isdigit():
+            rec_id = int(rec_id)  # 숫자 문자열 → 숫자 (이름 문자열은 화면에서 이름으로 매칭)
+        existing.append({"id": rec_id, "reason": str(item.get('reason', ''))})
+    result['existing_test_cases'] = existing
+    
+    new_cases = []
+    for idx, item in enumerate(response.get('new_test_cases') or [], 1):
+        if not isinstance(item, dict):
+            issues.append(f"new_test_cases {idx}번째: 객체가 아님 → 제외")
+            continue
+        missing = [field for field in NEW_TEST_CASE_FIELDS if field not in item]
+        if missing:
+            issues.append(f"new_test_cases {idx}번째: {', '.join(missing)} 없음 → 빈 값으로 보정")
+        case = {field: "" if item.get(field) is None else str(item.get(field)) for field in NEW_TEST_CASE_FIELDS}
+        try:
+            case['no'] = int(item.get('no'))
+        except (TypeError, ValueError):
+            case['no'] = idx
+        new_cases.append({"no": case.pop('no'), **case})
+    result['new_test_cases'] = new_cases
+    
+    return result, issues
+
+def salvage_recommendation(text):
+    """
+    전체 JSON 파싱 실패 시 필드/항목 단위로 복구
+    - 배열: 완성된 항목만 꺼냄 (깨진 항목만 버림)
+    - 문자열 필드: 개별 추출
+    """
+    response = {}
+    
+    for key in ['existing_test_cases', 'new_test_cases']:
+        parser = StreamingCaseParser(key)
+        response[key] = parser.feed(text)
+    
+    for field in RESPONSE_TEXT_FIELDS:
+        match = re.search(r'"%s"\s*:\s*"((?:[^"\\]|\\.)*)"' % field, text, re.DOTALL)
+        if match:
+            try:
+                response[field] = json.loads(f'"{match.group(1)}"', strict=False)
+            except json.JSONDecodeError:
+                response[field] = match.group(1)
+    
+    return response
+
+def parse_recommendation_response(text):
+    """
+    AI 응답 텍스트 → 검증된 추천 결과
+    
+    Returns:
+        tuple: (추천 결과 dict 또는 None, 문제 목록)
+    """
+    # ```json 코드 블록이 있으면 안쪽만 사용
+    if "```json" in text:
+        text = text.split("```json")[1].split("```")[0]
+    text = text.strip()
+    
+    try:
+        response = json.loads(text, strict=False)
+        if not isinstance(response, dict):
+            raise ValueError("최상위가 객체가 아님")
+        issues = []
+    except ValueError as e:
+        # 깨진 부분만 버리고 나머지 복구 (전체 재생성하지 않음)
+        response = salvage_recommendation(text)
+        issues = [f"JSON 파싱 오류 ({str(e)}) → 항목 단위 복구"]
+        if not response.get('new_test_cases') and not response.get('reasoning'):
+            return None, issues
+    
+    result, validation_issues = validate_recommendation(response)
+    return result, issues + validation_issues
+
+# =============================================
+# 2. 표 형식 변환
+# =============================================
+
+def ai_case_to_table_row(tc):
+    """AI가 생성한 new_test_cases 항목을 표 형식 행(row)으로 변환"""
+    return {
+        "NO": tc.get("no", ""),
+        "CATEGORY": tc.get("category", ""),
+        "DEPTH 1": tc.get("depth1", ""),
+        "DEPTH 2": tc.get("depth2", ""),
+        "DEPTH 3": tc.get("depth3", ""),
+        "PRE-CONDITION": tc.get("pre_condition", ""),
+        "STEP": tc.get("step", ""),
+        "EXPECT RESULT": tc.get("expect_result", "")
+    }
+
+# =============================================
+# 3. 프롬프트 생성 (토큰 예산 기반)
+# =============================================
+
+# 표 형식(dense table) 인코딩 컬럼
+CONTEXT_COLUMNS = ['id', 'category', 'name', 'depth1', 'depth2', 'depth3', 'pre_condition', 'step', 'expect_result', 'description']
+
+def estimate_tokens(text):
+    """
+    토큰 수 추정 (API 호출 없이 근사)
+    - 영문/숫자/기호: 약 4글자당 1토큰
+    - 한글 등 비ASCII: 약 1.5글자당 1토큰
+    """
+    ascii_count = sum(1 for ch in text if ord(ch) < 128)
+    return math.ceil(ascii_count / 4 + (len(text) - ascii_count) / 1.5)
+
+def compact_test_case(tc):
+    """
+    프롬프트용 최소 필드만 남김
+    - 표 그룹 행: name/description은 depth/step의 중복이므로 제외
+    - 줄글 케이스: name/description 유지
+    - 빈 값 제외
+    """
+    if tc.get('group_id'):
+        fields = ['id', 'category', 'depth1', 'depth2', 'depth3', 'pre_condition', 'step', 'expect_result']
+    else:
+        fields = ['id', 'category', 'name', 'description']
+    return {field: tc[field] for field in fields if tc.get(field) not in (None, '')}
+
+def encode_test_case(tc, encoding='json'):
+    """케이스 1개를 한 줄로 인코딩 ('json': 압축 JSON, 'table': | 구분 표)"""
+    compact = compact_test_case(tc)
+    if encoding == 'table':
+        return "|".join(
+            re.sub(r'\s+', ' ', str(compact.get(column, ''))).replace('|', '/')
+            for column in CONTEXT_COLUMNS
+        )
+    return json.dumps(compact, ensure_ascii=False, separators=(',', ':'))
+
+def pack_test_cases(test_cases, token_budget, encoding='json'):
+    """
+    유사도 높은 순으로 예산 안에 들어가는 만큼 케이스를 채움
+    
+    Returns:
+        tuple: (학습 데이터 문자열, 포함된 케이스 수, 사용 토큰 수)
+    """
+    ranked = sorted(
+        test_cases,
+        key=lambda tc: (tc.get('rrf_score') or 0, tc.get('similarity') or 0),
+        reverse=True
+    )
+    
+    header = "|".join(CONTEXT_COLUMNS) if encoding == 'table' else ""
+    used = estimate_tokens(header)
+    lines = []
+    for tc in ranked:
+        line = encode_test_case(tc, encoding)
+        cost = estimate_tokens(line) + 1
+        if used + cost > token_budget:
+            continue  # 큰 케이스는 건너뛰고 작은 케이스로 계속 채움
+        lines.append(line)
+        used += cost
+    
+    if encoding == 'table':
+        return "\n".join([header] + lines), len(lines), used
+    return "[\n" + ",\n".join(lines) + "\n]", len(lines), used
+
+def pack_spec_docs(spec_docs, token_budget, max_chars=500):
+    """
+    유사도 높은 순으로 예산 안에 들어가는 만큼 기획 문서를 채움
+    (문서 내용은 max_chars, 남은 예산 중 작은 쪽까지 자름)
+    
+    Returns:
+        tuple: (기획 문서 문자열, 포함된 문서 수, 사용 토큰 수)
+    """
+    if not spec_docs:
+        return "", 0, 0
+    
+    text = "\n\n=== 관련 기획 문서 ===\n"
+    used = estimate_tokens(text)
+    count = 0
+    
+    for doc in sorted(spec_docs, key=lambda d: d.get('similarity') or 0, reverse=True):
+        head = f"\n[문서 제목: {doc.get('title', '')}]\n[문서 유형: {doc.get('doc_type', '')}]\n[유사도: {doc.get('similarity', 0):.2%}]\n[내용]\n"
+        remaining = token_budget - used - estimate_tokens(head) - 5
+        if remaining <= 0:
+            break
+        
+        content = doc.get('content', '')[:max_chars]
+        while content and estimate_tokens(content) > remaining:
+            content = content[:int(len(content) * 0.8)]
+        if not content:
+            break
+        
+        entry = f"{head}{content}...\n\n---\n"
+        text += entry
+        used += estimate_tokens(entry)
+        count += 1
+    
+    return text, count, used
+
+def build_recommendation_prompt(query, test_cases, spec_docs, token_budget=PROMPT_TOKEN_BUDGET, spec_doc_share=0.25, encoding='json'):
+    """
+    테스트 케이스 추천 프롬프트 생성
+    
+    Args:
+        query (str): 사용자 요청
+        test_cases (list): 검색된 테스트 케이스 (similarity / rrf_score 기준 정렬)
+        spec_docs (list): 검색된 기획 문서
+        token_budget (int): 학습 데이터(케이스 + 문서) 토큰 예산
+        spec_doc_share (float): 예산 중 기획 문서 몫 (남으면 케이스에 넘김)
+        encoding (str): 케이스 인코딩 ('json' 또는 'table')
+    
+    Returns:
+        tuple: (프롬프트, 통계 dict)
+    """
+    spec_docs_str, doc_count, doc_tokens = pack_spec_docs(spec_docs, int(token_budget * spec_doc_share))
+    test_cases_str, case_count, case_tokens = pack_test_cases(test_cases, token_budget - doc_tokens, encoding)
+    
+    prompt = f"""[역할 부여]
+너는 나와 같이 IT 노코드 웹 빌더 SaaS에 다니고 있는 꼼꼼한 QA 전문가, QA 엔지니어야.
+(1) 테스트 설계, 테스트 케이스 작성, 자동화 업무 수행
+(3) 서비스 안정성 기여. 리그레이션을 중심 업무 수행
+
+확실하지 않은 정보는 '추정' 또는 '불확실'하다고 명시하고, 최신 정보가 필요한 경우 그렇게 알려줘.
+혹시나 실제 고객, 회원 이름이 들어간 문서가 있다면, 실제 이름 대신 'Customer A, B, C'를 사용해. 또는 '홍길동', '김영희'와 같은 가명을 사용해줘.
+개인정보나 기밀 정보는 일반화하여 처리해.
+
+[제품 정보]
+1. IO: 서비스 메인 페이지. 서비스 이용자는 IO에서 회원가입, 로그인을 하고 본인 소유 사이트를 관리 등을 함.
+2. BO: Back Office. 사이트 관리자가 접속해서 사이트를 관리하는 공간 (쇼핑몰 세팅, 예약 기능 세팅, 컨텐츠 관리 등). 관리자 페이지에서 '디자인 모드'에 접속할 수 있음.
+3. DM: 디자인 모드(Design Mode). 사이트 관리자가 접속해서 사이트를 디자인하는 공간 (상품 상세페이지 디자인 설정, 메뉴 추가/삭제, 메뉴 안에 위젯 추가/삭제 등)
+4. FO: Front Office. 실제 사이트 방문자(엔드유저)가 상품을 보고 구매하거나, 예약하거나, 게시글을 보는 곳
+
+[요청]
+"{query}"에 대한 테스트 케이스 작성
+
+[학습 데이터]
+다음은 현재 시스템에 등록된 테스트 케이스들입니다:
+{test_cases_str}
+
+{spec_docs_str}
+
+[테스트 케이스 표 양식]
+반드시 다음 양식을 따라서 테스트 케이스를 작성해줘:
+| NO | CATEGORY | DEPTH 1 | DEPTH 2 | DEPTH 3 | PRE-CONDITION | STEP | EXPECT RESULT |
+
+사용자의 요청을 분석하고, 다음을 수행할 것:
+1. 사용자가 테스트하려는 기능과 **직접 관련된** 테스트 케이스를 찾을 것
+2. 기획 문서를 참고하여 기능의 의도와 맥락을 파악할 것
+3. 그 기능이 작동하기 위해 **의존하는 다른 기능**들을 추론할 것
+4. 논리적인 순서로 테스트 체크리스트를 만들 것
+5. **반드시 위 표 양식으로 신규 테스트 케이스들을 생성할 것. NO 1부터 번호 시작**
+6. **existing_test_cases의 id는 반드시 숫자여야 함. 학습 데이터의 id 필드를 참조할 것**
+
+응답 형식:
+```json
+{{
+  "reasoning": "왜 이런 테스트 케이스들이 필요한지 단계별 추론 과정 (한국어로 설명)",
+  "existing_test_cases": [
+    {{
+      "id": 테스트케이스 숫자 ID (예: 1, 2, 3),
+      "reason": "이 기존 테스트가 왜 필요한지 간단한 설명"
+    }}
+  ],
+  "new_test_cases": [
+    {{
+      "no": 번호,
+      "category": "카테고리",
+      "depth1": "대분류",
+      "depth2": "중분류 또는 빈 문자열",
+      "depth3": "소분류 또는 빈 문자열",
+      "pre_condition": "사전조건 또는 빈 문자열",
+      "step": "수행 단계",
+      "expect_result": "예상 결과"
+    }}
+  ],
+  "test_order": "추천하는 테스트 순서 설명",
+  "additional_suggestions": "추가로 필요할 수 있는 테스트 제안(edge case)"
+}}
+```
+
+중요: 
+1. 반드시 JSON 형식으로만 응답
+2. new_test_cases는 반드시 표 양식에 맞춰 작성
+3. 벡터 검색으로 찾은 유사 케이스를 충분히 활용할 것
+"""
+    
+    stats = {
+        "cases": case_count,
+        "total_cases": len(test_cases),
+        "docs": doc_count,
+        "total_docs": len(spec_docs),
+        "context_tokens": case_tokens + doc_tokens,
+        "prompt_tokens": estimate_tokens(prompt)
+    }
+    return prompt, stats
+
+# =============================================
+# 4. 대량 생성 (개요 → 섹션별 병렬 생성)
+# =============================================
+
+# 섹션별 동시 생성 수
+SHARD_CONCURRENCY = int(os.environ.get("SHARD_CONCURRENCY", "4"))
+
+# 이 개수 이상 요청하면 자동으로 대량 생성 모드 사용
+SHARD_MIN_CASES = 20
+
+OUTLINE_SCHEMA = {
+    "type": "OBJECT",
+    "properties": {
+        "reasoning": {"type": "STRING"},
+        "existing_test_cases": RECOMMENDATION_SCHEMA["properties"]["existing_test_cases"],
+        "sections": {
+            "type": "ARRAY",
+            "items": {
+                "type": "OBJECT",
+                "properties": {
+                    "category": {"type": "STRING"},
+                    "depth1": {"type": "STRING"},
+                    "focus": {"type": "STRING"},
+                    "count": {"type": "INTEGER"}
+                },
+                "required": ["category", "depth1", "focus", "count"]
+            }
+        },
+        "test_order": {"type": "STRING"},
+        "additional_suggestions": {"type": "STRING"}
+    },
+    "required": ["reasoning", "existing_test_cases", "sections", "test_order", "additional_suggestions"]
+}
+
+def requested_case_count(query):
+    """요청에 적힌 케이스 개수 (예: "30개 이상" → 30, 없으면 0)"""
+    counts = [int(n) for n in re.findall(r'(\d+)\s*개', query)]
+    return max(counts) if counts else 0
+
+def build_outline_prompt(prompt):
+    """개요(섹션 목록) 생성 프롬프트"""
+    return prompt + """
+[이번 응답 범위 - 개요]
+이번 응답에서는 new_test_cases를 작성하지 말고, 신규 테스트 케이스를 나눠서 작성할 섹션 목록만 작성할 것.
+- sections: CATEGORY / DEPTH 1 단위 섹션 목록. focus에는 섹션에서 다룰 내용, count에는 섹션별 작성할 케이스 수
+- 섹션 count의 합이 사용자가 요청한 개수 이상이 되도록 할 것
+- reasoning, existing_test_cases, test_order, additional_suggestions는 평소처럼 작성
+"""
+
+def build_section_prompt(prompt, section):
+    """섹션 1개의 신규 테스트 케이스 생성 프롬프트"""
+    return prompt + f"""
+[이번 응답 범위 - 섹션]
+이번 응답에서는 아래 섹션의 신규 테스트 케이스만 {section.get('count', 5)}개 작성할 것.
+- CATEGORY: {section.get('category', '')}
+- DEPTH 1: {section.get('depth1', '')}
+- 다룰 내용: {section.get('focus', '')}
+reasoning, test_order, additional_suggestions는 한 문장으로 짧게, existing_test_cases는 빈 배열로 작성할 것.
+"""
+
+def merge_sections(outline, section_cases):
+    """개요 + 섹션별 케이스를 하나의 추천 결과로 합치고 NO를 1부터 다시 매김"""
+    new_test_cases = []
+    for cases in section_cases:
+        new_test_cases.extend(cases)
+    for no, tc in enumerate(new_test_cases, 1):
+        tc['no'] = no
+
+    return {
+        "reasoning": outline.get('reasoning', ''),
+        "existing_test_cases": outline.get('existing_test_cases', []),
+        "new_test_cases": new_test_cases,
+        "test_order": outline.get('test_order', ''),
+        "additional_suggestions": outline.get('additional_suggestions', '')
+    }
+
+def generate_sharded(client, prompt, max_workers=SHARD_CONCURRENCY, on_section_done=None):
+    """
+    대량 생성: 개요 1회 호출 후 섹션별로 병렬 생성해서 합침
+    (전체 소요 시간 ≈ 개요 + 가장 큰 섹션)
+    
+    Args:
+        client: Gemini GenerativeModel
+        prompt (str): 기본 추천 프롬프트
+        max_workers (int): 동시 생성 수
+        on_section_done (callable): 섹션 완료 시 호출 (완료 수, 전체 수, 케이스 리스트)
+    
+    Returns:
+        tuple: (추천 결과 dict 또는 None, 문제 목록)
+    """
+    # 1. 개요 생성
+    outline_response = client.generate_content(
+        build_outline_prompt(prompt),
+        generation_config={"response_mime_type": "application/json", "response_schema": OUTLINE_SCHEMA}
+    )
+    try:
+        outline = json.loads(outline_response.text, strict=False)
+        sections = [section for section in outline.get('sections') or [] if isinstance(section, dict)]
+    except ValueError:
+        outline, sections = {}, []
+    
+    if not sections:
+        # 개요 실패 → 한 번에 생성
+        response = client.generate_content(prompt, generation_config=STRUCTURED_GENERATION_CONFIG)
+        result, issues = parse_recommendation_response(response.text)
+        return result, ["개요 생성 실패 → 한 번에 생성"] + issues
+    
+    validated_outline, issues = validate_recommendation(outline)
+    
+    # 2. 섹션별 병렬 생성
+    def generate_section(section):
+        response = client.generate_content(
+            build_section_prompt(prompt, section),
+            generation_config=STRUCTURED_GENERATION_CONFIG
+        )
+        return parse_recommendation_response(response.text)
+    
+    section_cases = [[] for _ in sections]
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(generate_section, section): idx for idx, section in enumerate(sections)}
+        
+        for done, future in enumerate(as_completed(futures), 1):
+            idx = futures[future]
+            name = f"{sections[idx].get('category', '')} > {sections[idx].get('depth1', '')}"
+            try:
+                result, section_issues = future.result()
+                issues.extend(f"[{name}] {issue}" for issue in section_issues)
+                if result:
+                    section_cases[idx] = result['new_test_cases']
+                else:
+                    issues.append(f"[{name}] 섹션 생성 실패")
+            except Exception as e:
+                issues.append(f"[{name}] 섹션 생성 실패: {str(e)}")
+            
+            if on_section_done:
+                on_section_done(done, len(sections), section_cases[idx])
+    
+    # 3. 합치고 번호 다시 매김 (개요 순서 유지)
+    return merge_sections(validated_outline, section_cases), issues
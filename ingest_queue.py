@@ -0,0 +1,278 @@
+# ingest_queue.py
+"""
+표 형식 테스트 케이스 대량 저장 큐 (로컬 SQLite 파일, write-behind)
+- 업로드된 행을 묶음(chunk)으로 나눠 파일에 먼저 기록 → 백그라운드 워커가 임베딩 + 일괄 insert
+- 처리 상태가 파일에 남으므로 앱이 재시작되어도 남은 묶음부터 이어서 처리
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import datetime
+
+# 작업 상태
+OPEN = "open"          # 묶음 추가 중 (아직 처리 시작 전일 수 있음)
+QUEUED = "queued"      # 묶음 추가 완료, 처리 대기/진행 중
+DONE = "done"
+FAILED = "failed"      # 재시도 횟수를 넘긴 묶음이 있음
+ABORTED = "aborted"    # 묶음 추가 중 오류로 중단 (남은 묶음은 저장하지 않음)
+
+# 묶음 상태
+PENDING = "pending"
+RUNNING = "running"    # 워커가 처리 중 (중단해도 삭제하지 않음)
+
+
+class IngestQueue:
+    """
+    작업 → 묶음(chunk) 단위 저장 큐
+
+    Args:
+        db_path (str): SQLite 파일 경로
+        max_attempts (int): 묶음별 최대 시도 횟수 (초과 시 실패 처리, 수동 재시도 가능)
+        poll_seconds (float): 대기 중인 묶음이 없을 때 확인 간격 (초)
+    """
+
+    def __init__(self, db_path, max_attempts=3, poll_seconds=1.0):
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.max_attempts = max_attempts
+        self.poll_seconds = poll_seconds
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._worker = None
+        self._db = sqlite3.connect(db_path, check_same_thread=False)
+        self._db.executescript(
+            "CREATE TABLE IF NOT EXISTS ingest_jobs ("
+            "job_id TEXT PRIMARY KEY, "
+            "group_id TEXT NOT NULL, "
+            "label TEXT, "
+            "status TEXT NOT NULL, "
+            "total_rows INTEGER NOT NULL DEFAULT 0, "
+            "saved_rows INTEGER NOT NULL DEFAULT 0, "
+            "error TEXT, "
+            "created_at TEXT NOT NULL);"
+            "CREATE TABLE IF NOT EXISTS ingest_chunks ("
+            "job_id TEXT NOT NULL, "
+            "chunk_no INTEGER NOT NULL, "
+            "start_idx INTEGER NOT NULL, "
+            "rows TEXT NOT NULL, "
+            "row_count INTEGER NOT NULL, "
+            "status TEXT NOT NULL, "
+            "attempts INTEGER NOT NULL DEFAULT 0, "
+            "error TEXT, "
+            "PRIMARY KEY (job_id, chunk_no));"
+        )
+        # 처리 도중 앱이 종료된 묶음은 다시 대기 상태로
+        self._db.execute("UPDATE ingest_chunks SET status = ? WHERE status = ?", (PENDING, RUNNING))
+        self._db.commit()
+
+    # ---------- 작업 등록 ----------
+
+    def create_job(self, group_id, label):
+        """
+        작업 생성 (묶음은 add_chunk로 추가 후 close_job)
+
+        Returns:
+            str: 작업 id
+        """
+        job_id = uuid.uuid4().hex[:12]
+        with self._lock:
+            self._db.execute(
+                "INSERT INTO ingest_jobs (job_id, group_id, label, status, created_at) VALUES (?, ?, ?, ?, ?)",
+                (job_id, group_id, label, OPEN, datetime.now().isoformat())
+            )
+            self._db.commit()
+        return job_id
+
+    def add_chunk(self, job_id, rows):
+        """묶음 추가 (행 번호는 이전 묶음에 이어서 매김)"""
+        with self._lock:
+            chunk_no, start_idx = self._db.execute(
+                "SELECT COUNT(*), COALESCE(SUM(row_count), 0) FROM ingest_chunks WHERE job_id = ?", (job_id,)
+            ).fetchone()
+            self._db.execute(
+                "INSERT INTO ingest_chunks (job_id, chunk_no, start_idx, rows, row_count, status) VALUES (?, ?, ?, ?, ?, ?)",
+                (job_id, chunk_no + 1, start_idx + 1, json.dumps(rows, ensure_ascii=False), len(rows), PENDING)
+            )
+            self._db.execute(
+                "UPDATE ingest_jobs SET total_rows = total_rows + ? WHERE job_id = ?", (len(rows), job_id)
+            )
+            self._db.commit()
+        self._wakeup.set()
+
+    def close_job(self, job_id):
+        """묶음 추가 완료 표시"""
+        with self._lock:
+            self._db.execute("UPDATE ingest_jobs SET status = ? WHERE job_id = ? AND status = ?", (QUEUED, job_id, OPEN))
+            self._db.commit()
+            self._refresh_status(job_id)
+        self._wakeup.set()
+
+    def abort_job(self, job_id, error):
+        """
+        묶음 추가 중 오류 (파일 읽기 실패 등) → 작업 중단
+        - 아직 처리 전인 묶음만 삭제 (이미 저장된 행은 그대로, saved_rows로 확인)
+        - 워커가 처리 중인 묶음은 남겨둠 → 저장되면 saved_rows에 반영되므로 total_rows에서 빼지 않음
+        """
+        with self._lock:
+            dropped, = self._db.execute(
+                "SELECT COALESCE(SUM(row_count), 0) FROM ingest_chunks WHERE job_id = ? AND status = ?", (job_id, PENDING)
+            ).fetchone()
+            self._db.execute("DELETE FROM ingest_chunks WHERE job_id = ? AND status = ?", (job_id, PENDING))
+            self._db.execute(
+                "UPDATE ingest_jobs SET status = ?, error = ?, total_rows = total_rows - ? WHERE job_id = ?",
+                (ABORTED, error, dropped, job_id)
+            )
+            self._db.commit()
+
+    def enqueue(self, group_id, label, rows, chunk_size=200):
+        """
+        행 리스트를 chunk_size개씩 묶어서 한 번에 등록
+
+        Returns:
+            str: 작업 id
+        """
+        job_id = self.create_job(group_id, label)
+        self.add_rows(job_id, rows, chunk_size=chunk_size)
+        self.close_job(job_id)
+        return job_id
+
+    def add_rows(self, job_id, rows, chunk_size=200):
+        """행 리스트를 chunk_size개씩 묶어서 추가 (파일을 나눠 읽으며 계속 추가 가능)"""
+        for start in range(0, len(rows), chunk_size):
+            self.add_chunk(job_id, rows[start:start + chunk_size])
+
+    # ---------- 조회 / 재시도 ----------
+
+    def list_jobs(self, limit=20):
+        """최근 작업 목록"""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT job_id, group_id, label, status, total_rows, saved_rows, error, created_at "
+                "FROM ingest_jobs ORDER BY created_at DESC LIMIT ?", (limit,)
+            ).fetchall()
+            jobs = []
+            for row in rows:
+                job = dict(zip(
+                    ("job_id", "group_id", "label", "status", "total_rows", "saved_rows", "error", "created_at"), row
+                ))
+                job["chunks"] = dict(self._db.execute(
+                    "SELECT status, COUNT(*) FROM ingest_chunks WHERE job_id = ? GROUP BY status", (job["job_id"],)
+                ).fetchall())
+                jobs.append(job)
+        return jobs
+
+    def retry_failed(self, job_id):
+        """실패한 묶음을 다시 대기 상태로"""
+        with self._lock:
+            self._db.execute(
+                "UPDATE ingest_chunks SET status = ?, attempts = 0, error = NULL WHERE job_id = ? AND status = ?",
+                (PENDING, job_id, FAILED)
+            )
+            self._db.execute("UPDATE ingest_jobs SET status = ?, error = NULL WHERE job_id = ?", (QUEUED, job_id))
+            self._db.commit()
+        self._wakeup.set()
+
+    def remove_job(self, job_id):
+        """작업 기록 삭제 (이미 저장된 행은 그대로)"""
+        with self._lock:
+            self._db.execute("DELETE FROM ingest_chunks WHERE job_id = ?", (job_id,))
+            self._db.execute("DELETE FROM ingest_jobs WHERE job_id = ?", (job_id,))
+            self._db.commit()
+
+    # ---------- 백그라운드 워커 ----------
+
+    def start(self, process_chunk):
+        """
+        워커 스레드 시작 (이미 실행 중이면 무시)
+
+        Args:
+            process_chunk (callable): (group_id, rows, start_idx) → 저장된 행 수 (실패 시 예외)
+        """
+        if self._worker and self._worker.is_alive():
+            return
+        self._worker = threading.Thread(target=self._run, args=(process_chunk,), daemon=True, name="ingest-worker")
+        self._worker.start()
+
+    def _next_chunk(self):
+        """다음 처리할 묶음 (오래된 작업, 앞 묶음부터) - 처리 중 상태로 표시해서 꺼냄"""
+        with self._lock:
+            chunk = self._db.execute(
+                "SELECT c.job_id, c.chunk_no, c.start_idx, c.rows, j.group_id "
+                "FROM ingest_chunks c JOIN ingest_jobs j ON j.job_id = c.job_id "
+                "WHERE c.status = ? ORDER BY j.created_at, c.chunk_no LIMIT 1",
+                (PENDING,)
+            ).fetchone()
+            if chunk:
+                self._db.execute(
+                    "UPDATE ingest_chunks SET status = ? WHERE job_id = ? AND chunk_no = ?", (RUNNING, chunk[0], chunk[1])
+                )
+                self._db.commit()
+            return chunk
+
+    def _run(self, process_chunk):
+        """대기 중인 묶음을 순서대로 처리"""
+        while True:
+            chunk = self._next_chunk()
+            if chunk is None:
+                self._wakeup.wait(self.poll_seconds)
+                self._wakeup.clear()
+                continue
+
+            job_id, chunk_no, start_idx, rows, group_id = chunk
+            try:
+                saved = process_chunk(group_id, json.loads(rows), start_idx)
+            except Exception as e:
+                self._fail_chunk(job_id, chunk_no, str(e))
+                time.sleep(self.poll_seconds)  # 연속 실패 시 바로 재시도하지 않음
+                continue
+
+            with self._lock:
+                self._db.execute(
+                    "UPDATE ingest_chunks SET status = ?, rows = '[]', error = NULL WHERE job_id = ? AND chunk_no = ?",
+                    (DONE, job_id, chunk_no)
+                )
+                self._db.execute(
+                    "UPDATE ingest_jobs SET saved_rows = saved_rows + ? WHERE job_id = ?", (saved, job_id)
+                )
+                self._db.commit()
+                self._refresh_status(job_id)
+
+    def _fail_chunk(self, job_id, chunk_no, error):
+        """묶음 실패 기록 (최대 시도 횟수를 넘기면 실패 상태, 아니면 다시 대기)"""
+        with self._lock:
+            self._db.execute(
+                "UPDATE ingest_chunks SET attempts = attempts + 1, error = ?, "
+                "status = CASE WHEN attempts + 1 >= ? THEN ? ELSE ? END "
+                "WHERE job_id = ? AND chunk_no = ?",
+                (error, self.max_attempts, FAILED, PENDING, job_id, chunk_no)
+            )
+            self._db.commit()
+            self._refresh_status(job_id)
+
+    def _refresh_status(self, job_id):
+        """묶음 상태로 작업 상태 갱신 (lock 안에서 호출)"""
+        status, = self._db.execute("SELECT status FROM ingest_jobs WHERE job_id = ?", (job_id,)).fetchone() or (None,)
+        if status in (None, OPEN, ABORTED):
+            return
+
+        counts = dict(self._db.execute(
+            "SELECT status, COUNT(*) FROM ingest_chunks WHERE job_id = ? GROUP BY status", (job_id,)
+        ).fetchall())
+        if counts.get(PENDING) or counts.get(RUNNING):
+            new_status, error = QUEUED, None
+        elif counts.get(FAILED):
+            error, = self._db.execute(
+                "SELECT error FROM ingest_chunks WHERE job_id = ? AND status = ? ORDER BY chunk_no LIMIT 1",
+                (job_id, FAILED)
+            ).fetchone()
+            new_status = FAILED
+        else:
+            new_status, error = DONE, None
+
+        self._db.execute("UPDATE ingest_jobs SET status = ?, error = ? WHERE job_id = ?", (new_status, error, job_id))
+        self._db.commit()
@@ -0,0 +1,143 @@
+# job_queue.py
+"""
+백그라운드 작업 큐 (스레드 풀 + 작업 상태 저장소)
+- Streamlit 스크립트가 다시 실행(rerun)되어도 작업은 계속 진행됨
+- UI는 작업 id로 상태/진행률/결과를 조회(polling)
+"""
+
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+FINISHED_STATES = (DONE, FAILED, CANCELLED)
+
+
+class JobQueue:
+    """
+    작업 id 기반 백그라운드 작업 큐
+
+    Args:
+        max_workers (int): 동시에 실행할 작업 수 (초과분은 대기)
+        max_finished (int): 소유자별로 보관할 완료 작업 수 (초과 시 그 소유자의 오래된 것부터 삭제)
+        max_age_seconds (float): 완료 후 보관 시간 (지나면 확인하지 않았어도 삭제)
+    """
+
+    def __init__(self, max_workers=2, max_finished=50, max_age_seconds=24 * 3600):
+        self.max_finished = max_finished
+        self.max_age_seconds = max_age_seconds
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job")
+        self._jobs = {}  # 작업 id → 상태 dict
+        self._futures = {}
+        self._lock = threading.Lock()
+
+    def submit(self, owner, label, fn, *args, **kwargs):
+        """
+        작업 등록
+
+        Args:
+            owner (str): 작업 소유자 (세션 id 등)
+            label (str): 화면에 보여줄 이름
+            fn (callable): 실행할 함수 (report=진행률 콜백(progress, message, **추가 필드)을 키워드 인자로 받음,
+                추가 필드는 작업 상태에 그대로 저장됨 - 예: 중간 결과)
+
+        Returns:
+            str: 작업 id
+        """
+        job_id = uuid.uuid4().hex[:12]
+        with self._lock:
+            self._jobs[job_id] = {
+                "id": job_id,
+                "owner": owner,
+                "label": label,
+                "status": QUEUED,
+                "progress": 0.0,
+                "message": "대기 중",
+                "result": None,
+                "error": None,
+                "created_at": time.time(),
+                "finished_at": None
+            }
+            self._futures[job_id] = self._executor.submit(self._run, job_id, fn, args, kwargs)
+        return job_id
+
+    def get(self, job_id):
+        """작업 상태 조회 (없으면 None)"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+    def list(self, owner=None):
+        """작업 목록 (최근 등록 순)"""
+        with self._lock:
+            jobs = [dict(job) for job in self._jobs.values() if owner is None or job['owner'] == owner]
+        return sorted(jobs, key=lambda job: job['created_at'], reverse=True)
+
+    def cancel(self, job_id):
+        """대기 중인 작업 취소 (이미 실행 중이면 False)"""
+        with self._lock:
+            future = self._futures.get(job_id)
+            if future is None or not future.cancel():
+                return False
+            self._finish(job_id, CANCELLED, message="취소됨")
+            return True
+
+    def remove(self, job_id):
+        """완료된 작업 삭제"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job and job['status'] in FINISHED_STATES:
+                del self._jobs[job_id]
+                self._futures.pop(job_id, None)
+
+    def _run(self, job_id, fn, args, kwargs):
+        """작업 실행 (워커 스레드)"""
+        self._update(job_id, status=RUNNING, message="실행 중")
+
+        def report(progress, message=None, **fields):
+            self._update(job_id, progress=progress, message=message, **fields)
+
+        try:
+            result = fn(*args, report=report, **kwargs)
+        except Exception as e:
+            with self._lock:
+                self._finish(job_id, FAILED, error=str(e), message="실패")
+            return
+
+        with self._lock:
+            self._finish(job_id, DONE, result=result, progress=1.0, message="완료")
+
+    def _update(self, job_id, **fields):
+        """진행 상태 갱신 (None 값은 무시)"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job:
+                job.update({k: v for k, v in fields.items() if v is not None})
+
+    def _finish(self, job_id, status, **fields):
+        """
+        완료 처리 + 오래된 완료 작업 정리 (lock 안에서 호출)
+        - 같은 소유자의 완료 작업만 개수 제한 (다른 세션 작업 때문에 확인 전 결과가 지워지지 않음)
+        - 보관 시간이 지난 완료 작업은 소유자와 관계없이 삭제
+        """
+        job = self._jobs.get(job_id)
+        if not job:
+            return
+        now = time.time()
+        job.update(fields, status=status, finished_at=now)
+        self._futures.pop(job_id, None)
+
+        finished = sorted(
+            (j for j in self._jobs.values() if j['status'] in FINISHED_STATES),
+            key=lambda j: j['finished_at']
+        )
+        expired = [j for j in finished if now - j['finished_at'] > self.max_age_seconds]
+        own = [j for j in finished if j['owner'] == job['owner']]
+        for old in expired + own[:max(0, len(own) - self.max_finished)]:
+            self._jobs.pop(old['id'], None)
@@ -0,0 +1,258 @@
+# lexical_index.py
+"""
+키워드(lexical) 검색 인덱스 - BM25
+- 벡터 검색이 뭉개는 정확한 기능명(예: "구매평 연동")을 잡아내기 위한 용도
+"""
+
+import math
+import re
+from bisect import bisect_left
+from collections import Counter, defaultdict
+
+TOKEN_PATTERN = re.compile(r"\w+")
+HANGUL_PATTERN = re.compile(r"[가-힣]")
+
+# 검색 대상 필드 (test_cases 컬럼 + data JSONB의 표 필드)
+ROW_FIELDS = ['category', 'name', 'description']
+DATA_FIELDS = ['depth1', 'depth2', 'depth3', 'pre_condition', 'step', 'expect_result']
+
+
+def _hangul_grams(word, n=2):
+    """한글이 들어간 단어의 글자 n-gram (n글자 단어는 자기 자신, 더 짧거나 한글이 없으면 없음)"""
+    if len(word) < n or not HANGUL_PATTERN.search(word):
+        return []
+    return [word[i:i + n] for i in range(len(word) - n + 1)]
+
+
+def tokenize(text, n=2):
+    """
+    소문자 변환 후 단어 단위로 분리
+    한글 단어는 글자 n-gram도 추가 ("구매평을" → "구매평을", "구매", "매평", "평을")
+    - n-gram 규칙은 _hangul_grams와 같음 (단어 자신과 같은 조각은 중복이므로 제외)
+    """
+    tokens = []
+    for word in TOKEN_PATTERN.findall(str(text).lower()):
+        tokens.append(word)
+        tokens.extend(gram for gram in _hangul_grams(word, n) if gram != word)
+    return tokens
+
+
+def row_text(row):
+    """test_cases 행에서 검색 대상 텍스트 추출"""
+    data = row.get('data') or {}
+    values = [row.get(field) for field in ROW_FIELDS] + [data.get(field) for field in DATA_FIELDS]
+    return " ".join(str(value) for value in values if value)
+
+
+class BM25Index:
+    """
+    test_cases 행에 대한 BM25 역색인
+
+    Args:
+        k1 (float): 단어 빈도 포화 계수
+        b (float): 문서 길이 정규화 계수
+    """
+
+    def __init__(self, k1=1.5, b=0.75):
+        self.k1 = k1
+        self.b = b
+        self.rows = {}
+        self.postings = defaultdict(dict)  # 토큰 → {행 id: 빈도}
+        self.doc_lengths = {}
+
+    def build(self, rows):
+        """인덱스 생성"""
+        for row in rows:
+            tokens = tokenize(row_text(row))
+            self.rows[row['id']] = row
+            self.doc_lengths[row['id']] = len(tokens)
+            for token, tf in Counter(tokens).items():
+                self.postings[token][row['id']] = tf
+        return self
+
+    def search(self, query, limit=50):
+        """
+        BM25 점수 기준 검색
+
+        Returns:
+            list: (행, 점수) 튜플 리스트 (점수 내림차순)
+        """
+        n = len(self.rows)
+        if not n:
+            return []
+
+        avg_length = sum(self.doc_lengths.values()) / n
+        scores = defaultdict(float)
+
+        for token in set(tokenize(query)):
+            posting = self.postings.get(token)
+            if not posting:
+                continue
+
+            idf = math.log(1 + (n - len(posting) + 0.5) / (len(posting) + 0.5))
+            for doc_id, tf in posting.items():
+                norm = self.k1 * (1 - self.b + self.b * self.doc_lengths[doc_id] / avg_length)
+                scores[doc_id] += idf * tf * (self.k1 + 1) / (tf + norm)
+
+        ranked = sorted(scores.items(), key=lambda x: x[1], reverse=True)[:limit]
+        return [(self.rows[doc_id], score) for doc_id, score in ranked]
+
+
+class FieldIndex:
+    """
+    필드 가중치 역색인 (get_relevant_test_cases용, 점진적 갱신 가능)
+    - 단어 → {문서 키: 단어가 있는 필드 비트마스크}
+    - 한글 2글자 조각 → {문서 키: 필드 비트마스크} (조사가 붙은 단어, 부분 일치용)
+    - 검색어 단어별 필드 점수: 단어 일치 1.0 > 접두어 일치 PREFIX_CREDIT > 2글자 조각 일치 비율 × GRAM_CREDIT
+    - 문서 점수 = Σ 필드 가중치 × (검색어 단어별 필드 점수 평균)
+
+    Args:
+        field_weights (dict): {필드: 가중치} ('table_data'는 표 행 전체)
+    """
+
+    PREFIX_CREDIT = 0.75  # "login" → "loginpage", "구매평" → "구매평을"
+    GRAM_CREDIT = 0.5  # 조각만 일치 ("로그인" → "로그아웃"의 "로그")
+
+    def __init__(self, field_weights):
+        self.fields = list(field_weights)
+        self.weights = [field_weights[field] for field in self.fields]
+        self.words = defaultdict(dict)  # 단어 → {문서 키: 필드 비트마스크}
+        self.grams = defaultdict(dict)  # 한글 2글자 조각 → {문서 키: 필드 비트마스크}
+        self.docs = {}  # 문서 키 → (단어 목록, 조각 목록, 원본)
+        self._vocabulary = None  # 접두어 검색용 정렬된 단어 목록 (변경 시 다시 만듦)
+
+    @staticmethod
+    def doc_key(tc):
+        """문서 키 (id가 없으면 객체 식별자)"""
+        return tc['id'] if tc.get('id') is not None else id(tc)
+
+    def _field_texts(self, tc):
+        """필드별 텍스트"""
+        texts = []
+        for field in self.fields:
+            if field == 'table_data':
+                rows = tc.get('table_data') or []
+                rows = rows if isinstance(rows, list) else [rows]
+                texts.append(" ".join(str(value) for row in rows for value in row.values()))
+            else:
+                texts.append(str(tc.get(field) or ''))
+        return texts
+
+    def add(self, tc):
+        """문서 추가 (이미 있으면 교체 - 케이스를 수정했으면 이 함수로 다시 색인)"""
+        key = self.doc_key(tc)
+        self.remove(key)
+
+        word_masks = defaultdict(int)
+        gram_masks = defaultdict(int)
+        for bit, text in enumerate(self._field_texts(tc)):
+            for word in TOKEN_PATTERN.findall(text.lower()):
+                word_masks[word] |= 1 << bit
+                for gram in _hangul_grams(word):
+                    gram_masks[gram] |= 1 << bit
+
+        for word, mask in word_masks.items():
+            self.words[word][key] = mask
+        for gram, mask in gram_masks.items():
+            self.grams[gram][key] = mask
+        self.docs[key] = (list(word_masks), list(gram_masks), tc)
+        self._vocabulary = None
+
+    def remove(self, key):
+        """문서 제거"""
+        if key not in self.docs:
+            return
+        words, grams, _ = self.docs.pop(key)
+        for postings, tokens in ((self.words, words), (self.grams, grams)):
+            for token in tokens:
+                postings[token].pop(key, None)
+                if not postings[token]:
+                    del postings[token]
+        self._vocabulary = None
+
+    def sync(self, test_cases):
+        """
+        주어진 목록과 인덱스를 맞춤
+        - 이미 색인된 같은 객체는 건너뜀 (텍스트를 다시 만들지 않음)
+        - 새 객체/삭제된 문서만 갱신 → 케이스를 제자리에서 수정했다면 add()로 다시 색인
+        """
+        current = {}
+        for tc in test_cases:
+            current[self.doc_key(tc)] = tc
+
+        for key in list(self.docs):
+            if key not in current:
+                self.remove(key)
+
+        for key, tc in current.items():
+            doc = self.docs.get(key)
+            if doc is None or doc[2] is not tc:
+                self.add(tc)
+
+    def _prefixed_words(self, word):
+        """word로 시작하는 색인 단어 (word 자신 제외)"""
+        if self._vocabulary is None:
+            self._vocabulary = sorted(self.words)
+        start = bisect_left(self._vocabulary, word)
+        for candidate in self._vocabulary[start:]:
+            if not candidate.startswith(word):
+                break
+            if candidate != word:
+                yield candidate
+
+    def _word_credits(self, word):
+        """검색어 단어 1개의 {문서 키: [필드별 점수]}"""
+        credits = defaultdict(lambda: [0.0] * len(self.fields))
+
+        def apply(postings, value):
+            for key, mask in postings.items():
+                credit = credits[key]
+                for bit in range(len(self.fields)):
+                    if mask & (1 << bit) and credit[bit] < value:
+                        credit[bit] = value
+
+        # 조각 일치 (일치한 조각 비율만큼)
+        grams = set(_hangul_grams(word)) - {word}  # tokenize와 같은 규칙 (단어 자신은 아래 단어 일치로)
+        if grams:
+            hits = defaultdict(lambda: [0] * len(self.fields))
+            for gram in grams:
+                for key, mask in self.grams.get(gram, {}).items():
+                    for bit in range(len(self.fields)):
+                        if mask & (1 << bit):
+                            hits[key][bit] += 1
+            for key, counts in hits.items():
+                credit = credits[key]
+                for bit, count in enumerate(counts):
+                    credit[bit] = max(credit[bit], self.GRAM_CREDIT * count / len(grams))
+
+        for candidate in self._prefixed_words(word):
+            apply(self.words[candidate], self.PREFIX_CREDIT)
+        apply(self.words.get(word, {}), 1.0)
+        return credits
+
+    def search(self, query, limit=50):
+        """
+        검색어 단어별 일치 정도로 점수 계산
+
+        Returns:
+            list: (문서, 점수) 튜플 리스트 (점수 내림차순, 0점 제외)
+        """
+        query_words = set(TOKEN_PATTERN.findall(str(query).lower()))
+        if not query_words:
+            return []
+
+        field_scores = defaultdict(lambda: [0.0] * len(self.fields))
+        for word in query_words:
+            for key, credit in self._word_credits(word).items():
+                scores = field_scores[key]
+                for bit, value in enumerate(credit):
+                    scores[bit] += value
+
+        scored = []
+        for key, scores in field_scores.items():
+            score = sum(weight * value / len(query_words) for weight, value in zip(self.weights, scores))
+            if score > 0:
+                scored.append((score, key))
+
+        scored.sort(key=lambda x: x[0], reverse=True)
+        return [(self.docs[key][2], score) for score, key in scored[:limit]]
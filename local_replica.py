@@ -0,0 +1,448 @@
+# local_replica.py
+"""
+test_cases / spec_docs 로컬 읽기 전용 복제본 (SQLite 파일)
+- 목록/개수/통계/키워드 검색을 Supabase 대신 로컬에서 조회
+- 쓰기는 그대로 Supabase로 → 앱에서 쓴 행은 복제본에 바로 반영, 나머지는 백그라운드 동기화가 따라잡음
+- 동기화 방식
+  - 새 행: id 최고 수위(high-water mark) 이후 행만 keyset 조회
+    (처음 받는 동기화는 전체 비교를 겸함)
+  - 앱에서 수정한 행: dirty로 표시 → 다음 동기화에서 해당 id만 다시 조회
+  - 삭제: 앱에서 삭제하면 즉시 tombstone 기록 (진행 중인 동기화가 되살리지 않도록)
+  - 전체 비교(reconcile): 주기적으로 서버 전체 행의 내용 해시와 비교해서
+    늦게 커밋된 행(최고 수위보다 작은 id), 다른 곳에서 수정/삭제된 행을 반영
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+from lexical_index import row_text, tokenize
+
+# 테이블별 로컬 컬럼 (Supabase 'detail' 조회 컬럼과 동일)
+REPLICA_COLUMNS = {
+    'test_cases': ['id', 'category', 'name', 'link', 'description', 'data', 'created_at'],
+    'spec_docs': ['id', 'title', 'doc_type', 'link', 'content'],
+}
+
+
+def _row_hash(table_name, row):
+    """복제 컬럼 내용 해시 (전체 비교 시 바뀐 행 찾기용)"""
+    values = [row.get(col) for col in REPLICA_COLUMNS[table_name]]
+    return hashlib.sha1(json.dumps(values, ensure_ascii=False, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+
+class LocalReplica:
+    """
+    Supabase 테이블의 로컬 복제본
+
+    Args:
+        db_path (str): SQLite 파일 경로
+        fetch_pages (callable): (테이블, 조회 컬럼 이름, after_id) → id 오름차순 페이지 iterable
+        fetch_rows (callable): (테이블, id 리스트) → 행 리스트
+    """
+
+    def __init__(self, db_path, fetch_pages, fetch_rows):
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.fetch_pages = fetch_pages
+        self.fetch_rows = fetch_rows
+        self.last_error = None
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._worker = None
+        self._db = sqlite3.connect(db_path, check_same_thread=False)
+        self._db.executescript(
+            "CREATE TABLE IF NOT EXISTS test_cases ("
+            "id INTEGER PRIMARY KEY, category TEXT, name TEXT, link TEXT, description TEXT, "
+            "data TEXT, created_at TEXT, group_id TEXT, row_hash TEXT);"
+            "CREATE INDEX IF NOT EXISTS test_cases_group_id ON test_cases (group_id);"
+            "CREATE TABLE IF NOT EXISTS spec_docs ("
+            "id INTEGER PRIMARY KEY, title TEXT, doc_type TEXT, link TEXT, content TEXT, row_hash TEXT);"
+            "CREATE VIRTUAL TABLE IF NOT EXISTS test_cases_fts USING fts5(tokens);"
+            "CREATE TABLE IF NOT EXISTS sync_state ("
+            "table_name TEXT PRIMARY KEY, high_water_id INTEGER, high_water_created_at TEXT, "
+            "synced_at TEXT, reconciled_at REAL);"
+            "CREATE TABLE IF NOT EXISTS dirty_rows ("
+            "table_name TEXT NOT NULL, id INTEGER NOT NULL, version INTEGER NOT NULL DEFAULT 1, "
+            "PRIMARY KEY (table_name, id));"
+            "CREATE TABLE IF NOT EXISTS tombstones ("
+            "table_name TEXT NOT NULL, id INTEGER NOT NULL, deleted_at TEXT NOT NULL, "
+            "PRIMARY KEY (table_name, id));"
+        )
+        # 이전 버전에서 만든 파일에 없는 컬럼 추가
+        self._add_column('test_cases', 'row_hash', 'TEXT')
+        self._add_column('spec_docs', 'row_hash', 'TEXT')
+        self._add_column('dirty_rows', 'version', 'INTEGER NOT NULL DEFAULT 1')
+        self._db.commit()
+        self.reconcile_seconds = None
+
+    def _add_column(self, table_name, column, declaration):
+        """컬럼이 없으면 추가"""
+        columns = {r[1] for r in self._db.execute(f"PRAGMA table_info({table_name})").fetchall()}
+        if column not in columns:
+            self._db.execute(f"ALTER TABLE {table_name} ADD COLUMN {column} {declaration}")
+
+    # ---------- 상태 ----------
+
+    def is_ready(self, table_name):
+        """한 번 이상 동기화됐는지"""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT synced_at FROM sync_state WHERE table_name = ?", (table_name,)
+            ).fetchone()
+        return bool(row and row[0])
+
+    def status(self):
+        """테이블별 동기화 상태"""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT table_name, high_water_id, high_water_created_at, synced_at, reconciled_at FROM sync_state"
+            ).fetchall()
+            counts = {table: self._db.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0] for table in REPLICA_COLUMNS}
+            tombstones = self._db.execute("SELECT COUNT(*) FROM tombstones").fetchone()[0]
+        return {
+            "tables": {
+                table: {
+                    "high_water_id": high_water_id,
+                    "high_water_created_at": created_at,
+                    "synced_at": synced_at,
+                    "reconciled_at": datetime.fromtimestamp(reconciled_at).isoformat() if reconciled_at else None,
+                    "rows": counts[table]
+                }
+                for table, high_water_id, created_at, synced_at, reconciled_at in rows
+            },
+            "tombstones": tombstones,
+            "reconcile_seconds": self.reconcile_seconds,
+            "last_error": self.last_error
+        }
+
+    # ---------- 앱에서 쓰기 후 알림 ----------
+
+    def mark_changed(self, table_name, ids=()):
+        """
+        수정된 행 표시 (id 없이 호출하면 새 행만 빨리 가져오도록 깨움)
+        - 이미 dirty인 행은 version을 올림 → 진행 중인 동기화가 이전 조회 결과로 덮어쓰지 않음
+        """
+        if ids:
+            with self._lock:
+                self._db.executemany(
+                    "INSERT INTO dirty_rows (table_name, id) VALUES (?, ?) "
+                    "ON CONFLICT (table_name, id) DO UPDATE SET version = version + 1",
+                    [(table_name, row_id) for row_id in ids]
+                )
+                self._db.commit()
+        self.request_sync()
+
+    def request_sync(self):
+        """대기 중인 동기화 스레드를 바로 깨움"""
+        self._wakeup.set()
+
+    def upsert_rows(self, table_name, rows):
+        """앱에서 insert한 행을 바로 반영 (insert 응답 행 그대로, 다음 동기화를 기다리지 않음)"""
+        with self._lock:
+            self._upsert_rows(table_name, list(rows))
+            self._db.commit()
+
+    def patch_row(self, table_name, row_id, fields):
+        """앱에서 수정한 값을 바로 반영 (저장 직후 목록에 이전 값이 보이지 않도록)"""
+        with self._lock:
+            cursor = self._db.execute(f"SELECT * FROM {table_name} WHERE id = ?", (row_id,))
+            values = cursor.fetchone()
+            if values is None:
+                return
+            row = dict(zip([d[0] for d in cursor.description], values))
+            if 'data' in row:
+                row['data'] = json.loads(row['data']) if row['data'] else {}
+            row.update(fields)
+            self._upsert_rows(table_name, [row])
+            self._db.commit()
+
+    def mark_deleted(self, table_name, ids):
+        """삭제된 행을 즉시 제거 + tombstone 기록"""
+        with self._lock:
+            self._delete_rows(table_name, ids)
+            self._db.commit()
+
+    # ---------- 동기화 ----------
+
+    def sync(self, table_name, page_size=1000):
+        """
+        증분 동기화 (새 행 + dirty 행)
+
+        Returns:
+            int: 반영한 행 수
+        """
+        with self._lock:
+            row = self._db.execute(
+                "SELECT high_water_id, high_water_created_at FROM sync_state WHERE table_name = ?", (table_name,)
+            ).fetchone()
+        high_water_id, high_water_created_at = row or (None, None)
+        # 처음부터 받는 동기화는 그 자체로 전체 비교와 같음 → 바로 이어서 reconcile하지 않도록 기록
+        full_sync_started = time.time() if high_water_id is None else None
+
+        applied = 0
+
+        # 1. 최고 수위 이후 새 행
+        for page in self.fetch_pages(table_name, 'detail', high_water_id):
+            with self._lock:
+                applied += len(self._upsert_rows(table_name, page))
+                high_water_id = page[-1]['id']
+                high_water_created_at = page[-1].get('created_at', high_water_created_at)
+                self._save_state(table_name, high_water_id, high_water_created_at)
+                self._db.commit()
+
+        # 2. 앱에서 수정한 행 다시 조회 (없어졌으면 삭제)
+        with self._lock:
+            dirty = dict(self._db.execute(
+                "SELECT id, version FROM dirty_rows WHERE table_name = ?", (table_name,)
+            ).fetchall())
+        dirty_ids = list(dirty)
+        for start in range(0, len(dirty_ids), page_size):
+            batch = dirty_ids[start:start + page_size]
+            rows = self.fetch_rows(table_name, batch)
+            with self._lock:
+                # 조회하는 사이 다시 수정된 행은 건너뜀 (다음 동기화에서 다시 조회)
+                current = self._dirty_versions(table_name)
+                settled = {row_id for row_id in batch if current.get(row_id) == dirty[row_id]}
+                applied += len(self._upsert_rows(table_name, [r for r in rows if r['id'] in settled]))
+                self._delete_rows(table_name, settled - {r['id'] for r in rows})
+                self._db.executemany(
+                    "DELETE FROM dirty_rows WHERE table_name = ? AND id = ? AND version = ?",
+                    [(table_name, row_id, dirty[row_id]) for row_id in settled]
+                )
+                self._db.commit()
+
+        with self._lock:
+            self._save_state(table_name, high_water_id, high_water_created_at)
+            self._db.execute(
+                "UPDATE sync_state SET synced_at = ? WHERE table_name = ?", (datetime.now().isoformat(), table_name)
+            )
+            if full_sync_started is not None:
+                self._db.execute(
+                    "UPDATE sync_state SET reconciled_at = ? WHERE table_name = ?", (full_sync_started, table_name)
+                )
+            self._db.commit()
+        return applied
+
+    def reconcile(self, table_name):
+        """
+        서버 전체 행과 비교 (id 증분 동기화가 놓치는 변경 반영)
+        - 로컬에 없는 행 (최고 수위보다 작은 id로 늦게 커밋된 행) → 추가
+        - 내용 해시가 다른 행 (다른 곳에서 수정) → 갱신
+        - 서버에 없는 행 (다른 곳에서 삭제) → 삭제
+
+        Returns:
+            dict: {"added", "updated", "removed"} 행 수
+        """
+        with self._lock:
+            local_hashes = dict(self._db.execute(f"SELECT id, row_hash FROM {table_name}").fetchall())
+
+        summary = {"added": 0, "updated": 0, "removed": 0}
+        server_ids = set()
+        for page in self.fetch_pages(table_name, 'detail', None):
+            server_ids.update(row['id'] for row in page)
+            changed = [row for row in page if local_hashes.get(row['id']) != _row_hash(table_name, row)]
+            if not changed:
+                continue
+            with self._lock:
+                # 앱에서 수정 중인 행은 dirty 재조회에 맡김 (이 페이지가 수정 전 값일 수 있음)
+                dirty = self._dirty_versions(table_name)
+                applied = self._upsert_rows(table_name, [row for row in changed if row['id'] not in dirty])
+                self._db.commit()
+            for row in applied:
+                summary["updated" if row['id'] in local_hashes else "added"] += 1
+
+        with self._lock:
+            local_ids = {r[0] for r in self._db.execute(f"SELECT id FROM {table_name}").fetchall()}
+            removed = local_ids - server_ids
+            self._delete_rows(table_name, removed)
+            summary["removed"] = len(removed)
+            # 서버에서도 없어진 tombstone은 더 이상 필요 없음
+            tombstone_ids = [r[0] for r in self._db.execute(
+                "SELECT id FROM tombstones WHERE table_name = ?", (table_name,)
+            ).fetchall()]
+            self._db.executemany(
+                "DELETE FROM tombstones WHERE table_name = ? AND id = ?",
+                [(table_name, row_id) for row_id in tombstone_ids if row_id not in server_ids]
+            )
+            self._db.execute(
+                "UPDATE sync_state SET reconciled_at = ? WHERE table_name = ?", (time.time(), table_name)
+            )
+            self._db.commit()
+        return summary
+
+    def start(self, interval_seconds=30, reconcile_seconds=600):
+        """백그라운드 동기화 스레드 시작 (이미 실행 중이면 무시)"""
+        if self._worker and self._worker.is_alive():
+            return
+        self.reconcile_seconds = reconcile_seconds
+        self._worker = threading.Thread(
+            target=self._run, args=(interval_seconds, reconcile_seconds), daemon=True, name="replica-sync"
+        )
+        self._worker.start()
+
+    def _run(self, interval_seconds, reconcile_seconds):
+        """interval_seconds마다 (또는 앱에서 쓰기 알림 시) 동기화"""
+        while True:
+            try:
+                for table_name in REPLICA_COLUMNS:
+                    self.sync(table_name)
+                    with self._lock:
+                        row = self._db.execute(
+                            "SELECT reconciled_at FROM sync_state WHERE table_name = ?", (table_name,)
+                        ).fetchone()
+                    if not row or not row[0] or time.time() - row[0] >= reconcile_seconds:
+                        self.reconcile(table_name)
+                self.last_error = None
+            except Exception as e:
+                self.last_error = str(e)
+
+            self._wakeup.wait(interval_seconds)
+            self._wakeup.clear()
+
+    def _save_state(self, table_name, high_water_id, high_water_created_at):
+        """최고 수위 기록 (lock 안에서 호출)"""
+        self._db.execute(
+            "INSERT INTO sync_state (table_name, high_water_id, high_water_created_at) VALUES (?, ?, ?) "
+            "ON CONFLICT (table_name) DO UPDATE SET "
+            "high_water_id = excluded.high_water_id, high_water_created_at = excluded.high_water_created_at",
+            (table_name, high_water_id, high_water_created_at)
+        )
+
+    def _dirty_versions(self, table_name):
+        """dirty 행 {id: version} (lock 안에서 호출)"""
+        return dict(self._db.execute(
+            "SELECT id, version FROM dirty_rows WHERE table_name = ?", (table_name,)
+        ).fetchall())
+
+    def _upsert_rows(self, table_name, rows):
+        """
+        행 반영 (tombstone이 있는 행은 건너뜀, lock 안에서 호출)
+
+        Returns:
+            list: 실제로 반영한 행
+        """
+        if not rows:
+            return []
+        tombstoned = {r[0] for r in self._db.execute(
+            f"SELECT id FROM tombstones WHERE table_name = ? AND id IN ({','.join('?' * len(rows))})",
+            [table_name] + [row['id'] for row in rows]
+        ).fetchall()}
+        rows = [row for row in rows if row['id'] not in tombstoned]
+
+        columns = REPLICA_COLUMNS[table_name]
+        if table_name == 'test_cases':
+            values = [
+                [row.get(col) if col != 'data' else json.dumps(row.get('data') or {}, ensure_ascii=False) for col in columns]
+                + [(row.get('data') or {}).get('group_id'), _row_hash(table_name, row)]
+                for row in rows
+            ]
+            columns = columns + ['group_id', 'row_hash']
+        else:
+            values = [[row.get(col) for col in columns] + [_row_hash(table_name, row)] for row in rows]
+            columns = columns + ['row_hash']
+
+        self._db.executemany(
+            f"INSERT OR REPLACE INTO {table_name} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})",
+            values
+        )
+        if table_name == 'test_cases':
+            self._db.executemany("DELETE FROM test_cases_fts WHERE rowid = ?", [(row['id'],) for row in rows])
+            self._db.executemany(
+                "INSERT INTO test_cases_fts (rowid, tokens) VALUES (?, ?)",
+                [(row['id'], " ".join(tokenize(row_text(row)))) for row in rows]
+            )
+        return rows
+
+    def _delete_rows(self, table_name, ids):
+        """행 삭제 + tombstone (lock 안에서 호출)"""
+        ids = list(ids)
+        if not ids:
+            return
+        self._db.executemany(f"DELETE FROM {table_name} WHERE id = ?", [(row_id,) for row_id in ids])
+        if table_name == 'test_cases':
+            self._db.executemany("DELETE FROM test_cases_fts WHERE rowid = ?", [(row_id,) for row_id in ids])
+        now = datetime.now().isoformat()
+        self._db.executemany(
+            "INSERT OR REPLACE INTO tombstones (table_name, id, deleted_at) VALUES (?, ?, ?)",
+            [(table_name, row_id, now) for row_id in ids]
+        )
+
+    # ---------- 조회 ----------
+
+    def _select(self, sql, params=()):
+        """조회 결과를 Supabase 행과 같은 dict로 (data는 JSON 파싱)"""
+        with self._lock:
+            cursor = self._db.execute(sql, params)
+            names = [d[0] for d in cursor.description]
+            rows = [dict(zip(names, values)) for values in cursor.fetchall()]
+        for row in rows:
+            if 'data' in row:
+                row['data'] = json.loads(row['data']) if row['data'] else {}
+            row.pop('group_id', None)
+            row.pop('row_hash', None)
+        return rows
+
+    def count(self, table_name):
+        """행 개수"""
+        with self._lock:
+            return self._db.execute(f"SELECT COUNT(*) FROM {table_name}").fetchone()[0]
+
+    def category_stats(self):
+        """test_cases 카테고리별 개수"""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT COALESCE(NULLIF(category, ''), '미분류'), COUNT(*) FROM test_cases GROUP BY 1"
+            ).fetchall()
+        return dict(rows)
+
+    def test_cases_before(self, before_id=None, limit=50):
+        """id 내림차순 페이지 (before_id보다 작은 행부터)"""
+        if before_id is None:
+            return self._select("SELECT * FROM test_cases ORDER BY id DESC LIMIT ?", (limit,))
+        return self._select("SELECT * FROM test_cases WHERE id < ? ORDER BY id DESC LIMIT ?", (before_id, limit))
+
+    def test_cases_in_groups(self, group_ids):
+        """그룹에 속한 행 전체 (id 오름차순)"""
+        group_ids = list(group_ids)
+        return self._select(
+            f"SELECT * FROM test_cases WHERE group_id IN ({','.join('?' * len(group_ids))}) ORDER BY id", group_ids
+        )
+
+    def group_counts(self, group_ids):
+        """그룹별 전체 행 수"""
+        group_ids = list(group_ids)
+        with self._lock:
+            rows = self._db.execute(
+                f"SELECT group_id, COUNT(*) FROM test_cases WHERE group_id IN ({','.join('?' * len(group_ids))}) "
+                "GROUP BY group_id", group_ids
+            ).fetchall()
+        return dict(rows)
+
+    def spec_docs(self):
+        """기획 문서 전체 (최신순)"""
+        return self._select("SELECT * FROM spec_docs ORDER BY id DESC")
+
+    def search_test_cases(self, query, limit=50):
+        """
+        키워드 검색 (FTS5 bm25, 토큰화는 lexical_index와 동일 - 한글 2글자 조각 포함)
+
+        Returns:
+            list: (행, 점수) 튜플 리스트 (점수 내림차순)
+        """
+        tokens = sorted(set(tokenize(query)))
+        if not tokens:
+            return []
+        match = " OR ".join('"%s"' % token.replace('"', '""') for token in tokens)
+        rows = self._select(
+            "SELECT t.*, -bm25(test_cases_fts) AS score FROM test_cases_fts "
+            "JOIN test_cases t ON t.id = test_cases_fts.rowid "
+            "WHERE test_cases_fts MATCH ? ORDER BY bm25(test_cases_fts) LIMIT ?",
+            (match, limit)
+        )
+        return [(row, row.pop('score')) for row in rows]
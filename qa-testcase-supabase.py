@@ -15,79 +15,230 @@
 # =====================================================================================
 
 import streamlit as st
-import json
 from datetime import datetime
 import google.generativeai as genai
 import os
+import uuid
 import pandas as pd
-from io import BytesIO, StringIO
+from lexical_index import FieldIndex
+from table_rows import TABLE_COLUMNS, clean_table_frame, missing_columns, table_rows_from_frame, iter_table_chunks
+from gemini_helpers import (
+    ai_case_to_table_row,
+    requested_case_count,
+    SHARD_MIN_CASES
+)
+from response_cache import ResponseCache
+from job_queue import JobQueue
+from recommendation import run_recommendation
 from supabase_helpers import (
     get_supabase_client,
+    get_gemini_api,
+    get_ingest_queue,
     save_test_case_to_supabase,
-    load_test_cases_from_supabase,
     delete_test_case_from_supabase,
     save_spec_doc_to_supabase,
     load_spec_docs_from_supabase,
-    search_similar_test_cases,
-    search_similar_spec_docs
+    get_embedding_cache,
+    get_query_embedding_cache,
+    save_table_group_changes,
+    delete_test_cases_from_supabase,
+    count_rows,
+    get_category_stats,
+    load_test_cases_page,
+    load_group_rows,
+    compare_vector_search,
+    iter_table_pages,
+    test_case_export_row,
+    TEST_CASE_EXPORT_COLUMNS,
+    export_table,
+    notify_replica,
+    get_local_replica
 )
 
 # Excel 지원 확인
 try:
-    import openpyxl
-    from openpyxl.styles import PatternFill, Font, Alignment, Border, Side
+    from excel_export import write_xlsx, TEST_CASE_COLUMN_WIDTHS
     EXCEL_AVAILABLE = True
 except ImportError:
     EXCEL_AVAILABLE = False
     st.warning("⚠️ Excel 다운로드 기능을 사용하려면 터미널에서 다음 명령을 실행하세요: pip install openpyxl")
 
-# Google Gemini API 클라이언트 초기화
+# Google Gemini API 클라이언트 초기화 (공용 클라이언트의 속도 제한/재시도 적용)
 @st.cache_resource
 def get_gemini_client():
-    api_key = os.environ.get("GOOGLE_API_KEY")
-    if not api_key:
-        st.error("GOOGLE_API_KEY 환경 변수가 설정되지 않았습니다.")
+    api = get_gemini_api()
+    if not api:
         return None
-    genai.configure(api_key=api_key)
-    return genai.GenerativeModel('models/gemini-2.5-flash')
-    # return genai.GenerativeModel('models/gemini-2.5-pro') # 품질 중요시
-    # return genai.GenerativeModel('gemini-2.0-flash-exp') # 베타 버전
+    return api.model('models/gemini-2.5-flash')
+    # return api.model('models/gemini-2.5-pro') # 품질 중요시
+    # return api.model('gemini-2.0-flash-exp') # 베타 버전
+
+# 이 크기(MB)를 넘는 업로드 파일은 묶음 단위로 읽어서 바로 저장 (편집 표에 올리지 않음)
+STREAMING_UPLOAD_MB = float(os.environ.get("STREAMING_UPLOAD_MB", "1"))
+
+# AI 추천 결과 캐시 (로컬 SQLite 파일)
+@st.cache_resource
+def get_response_cache():
+    return ResponseCache(
+        os.environ.get("RESPONSE_CACHE_PATH", ".cache/responses.sqlite3"),
+        max_items=int(os.environ.get("RESPONSE_CACHE_MAX_ITEMS", "500")),
+        ttl_seconds=int(os.environ.get("RESPONSE_CACHE_TTL_SECONDS", str(30 * 24 * 3600)))
+    )
+
+# AI 추천 백그라운드 작업 큐 (모든 세션 공유, rerun과 무관하게 유지)
+@st.cache_resource
+def get_job_queue():
+    return JobQueue(max_workers=int(os.environ.get("RECOMMENDATION_WORKERS", "2")))
+
+def get_job_owner():
+    """현재 세션의 작업 소유자 id"""
+    if 'job_owner' not in st.session_state:
+        st.session_state.job_owner = uuid.uuid4().hex
+    return st.session_state.job_owner
+
+def recommendation_job(client, response_cache, query, shard_mode=False, force_regenerate=False, report=None):
+    """
+    백그라운드 작업용 AI 추천 (파싱 실패는 작업 실패로 처리)
+    - 생성된 케이스는 작업 상태의 partial_cases로 전달 (작업 목록에서 미리보기)
+    """
+    partial_cases = []
+
+    def on_cases(cases):
+        partial_cases.extend(cases)
+        report(None, partial_cases=list(partial_cases))
+
+    result = run_recommendation(
+        client,
+        response_cache,
+        query,
+        shard_mode=shard_mode,
+        force_regenerate=force_regenerate,
+        report=report,
+        on_cases=on_cases
+    )
+    if result['ai_response'] is None:
+        errors = f" ({'; '.join(result['errors'])})" if result['errors'] else ""
+        raise ValueError(f"AI 응답을 처리할 수 없습니다. 다시 시도해주세요.{errors}")
+    return result
+
+def apply_recommendation_result(query, result):
+    """추천 결과를 화면 상태(결과, 검색된 케이스, 검색 기록)에 반영"""
+    st.session_state.relevant_cases = result['relevant_cases']
+    st.session_state.last_ai_response = result['ai_response']
+    st.session_state.search_history.append({
+        "query": query,
+        "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "response": result['ai_response']
+    })
+
+JOB_STATUS_LABELS = {
+    "queued": "⏸️ 대기 중",
+    "running": "⏳ 실행 중",
+    "done": "✅ 완료",
+    "failed": "❌ 실패",
+    "cancelled": "🚫 취소됨"
+}
+
+def render_job_panel():
+    """백그라운드 작업 목록 (진행률, 결과 보기/취소/삭제)"""
+    job_queue = get_job_queue()
+    jobs = job_queue.list(owner=get_job_owner())
+    if not jobs:
+        return
+
+    st.markdown("### 🕒 AI 추천 작업")
+    for job in jobs:
+        col_label, col_action = st.columns([4, 1])
+        with col_label:
+            st.write(f"{JOB_STATUS_LABELS.get(job['status'], job['status'])} · **{job['label']}**")
+            if job['status'] == "running":
+                st.progress(job['progress'], text=job['message'])
+                if job.get('partial_cases'):
+                    with st.expander(f"생성 중인 테스트 케이스 ({len(job['partial_cases'])}개)"):
+                        st.dataframe(
+                            pd.DataFrame([ai_case_to_table_row(tc) for tc in job['partial_cases']]),
+                            use_container_width=True,
+                            hide_index=True
+                        )
+            elif job['status'] == "failed":
+                st.caption(f"오류: {job['error']}")
+            elif job['status'] == "done":
+                issues = job['result']['issues']
+                notes = [f"신규 케이스 {len(job['result']['ai_response'].get('new_test_cases') or [])}개"]
+                if job['result']['from_cache']:
+                    notes.append("이전 결과 재사용")
+                if issues:
+                    notes.append(f"응답 보정 {len(issues)}건")
+                if job['result']['errors']:
+                    notes.append(f"검색 경고 {len(job['result']['errors'])}건")
+                st.caption(" · ".join(notes))
+                for error in job['result']['errors']:
+                    st.caption(f"⚠️ {error}")
+
+        with col_action:
+            if job['status'] == "done":
+                if st.button("결과 보기", key=f"job_open_{job['id']}"):
+                    apply_recommendation_result(job['result']['query'], job['result'])
+                    job_queue.remove(job['id'])
+                    st.rerun()
+            elif job['status'] == "queued":
+                if st.button("취소", key=f"job_cancel_{job['id']}"):
+                    job_queue.cancel(job['id'])
+                    st.rerun(scope="fragment")
+            elif job['status'] in ("failed", "cancelled"):
+                if st.button("삭제", key=f"job_remove_{job['id']}"):
+                    job_queue.remove(job['id'])
+                    st.rerun(scope="fragment")
+
+INGEST_STATUS_LABELS = {
+    "open": "📤 등록 중",
+    "queued": "⏳ 저장 중",
+    "done": "✅ 완료",
+    "failed": "❌ 일부 실패",
+    "aborted": "🚫 중단됨"
+}
+
+def render_ingest_panel():
+    """대량 저장 작업 목록 (진행률, 실패 묶음 재시도/기록 삭제)"""
+    ingest_queue = get_ingest_queue()
+    st.markdown("**📥 대량 저장 작업**")
+    for job in ingest_queue.list_jobs(limit=10):
+        total = job['total_rows'] or 1
+        st.write(f"{INGEST_STATUS_LABELS.get(job['status'], job['status'])} · **{job['label']}** ({job['saved_rows']}/{job['total_rows']}행)")
+        if job['status'] in ('open', 'queued'):
+            st.progress(min(job['saved_rows'] / total, 1.0))
+        elif job['status'] == 'failed':
+            st.caption(f"실패 묶음 {job['chunks'].get('failed', 0)}개: {job['error']}")
+            if st.button("🔁 실패한 묶음 다시 저장", key=f"ingest_retry_{job['job_id']}"):
+                ingest_queue.retry_failed(job['job_id'])
+                st.rerun(scope="fragment")
+        elif job['status'] == 'aborted':
+            st.caption(job['error'])
+        if job['status'] in ('done', 'failed', 'aborted'):
+            if st.button("기록 삭제", key=f"ingest_remove_{job['job_id']}"):
+                ingest_queue.remove_job(job['job_id'])
+                st.rerun(scope="fragment")
 
 # ✅ 연관성 기반 필터링 함수
+# 필드별 가중치 (필드 점수 = 가중치 × 검색어 단어가 일치한 정도, FieldIndex 참고)
+RELEVANCE_FIELD_WEIGHTS = {
+    'category': 1,
+    'name': 2,
+    'description': 5,
+    'table_data': 3
+}
+
 def get_relevant_test_cases(query, test_cases, max_cases=50):
     """검색어와 연관성 높은 테스트 케이스 추출"""
-    # 1. 검색어에서 주요 키워드 추출 (소문자 변환)
-    query_keywords = set(query.lower().split())
-    scored_cases = []
-
-    # 2. 각 테스트 케이스의 연관성 점수 계산
-    for tc in test_cases:
-        score = 0
-                
-        # 카테고리 매칭 (가중치 3)
-        if tc.get('category') and any(k in tc['category'].lower() for k in query_keywords):
-            score += 1
-
-        # 이름/제목 매칭 (가중치 2)
-        if tc.get('name') and any(k in tc['name'].lower() for k in query_keywords):
-            score += 2
-
-        # 설명/내용 매칭 (가중치 1)
-        if tc.get('description') and any(k in tc['description'].lower() for k in query_keywords):
-            score += 5
-
-        # 표 데이터 매칭 (가중치 1)
-        if tc.get('table_data'):
-            for row in tc['table_data']:
-                if any(k in str(row).lower() for k in query_keywords):
-                    score += 3
-                    break
-        scored_cases.append((score, tc))
-
-    # 3. 점수 높은 순으로 정렬 후 상위 N개 선택
-    scored_cases.sort(reverse=True, key=lambda x: x[0])
-    relevant = [tc for score, tc in scored_cases if score > 0][:max_cases]
-    # 4. 연관성 없으면 최근 케이스 반환
+    # 1. 세션별 역색인을 현재 목록과 동기화 (새 케이스/삭제된 케이스만 반영, 수정 시 index.add로 다시 색인)
+    if 'relevance_index' not in st.session_state:
+        st.session_state.relevance_index = FieldIndex(RELEVANCE_FIELD_WEIGHTS)
+    index = st.session_state.relevance_index
+    index.sync(test_cases)
+
+    # 2. 검색어 단어별 필드 일치 정도로 점수 계산 후 상위 N개 선택
+    relevant = [tc for tc, score in index.search(query, max_cases)]
+    # 3. 연관성 없으면 최근 케이스 반환
     return relevant if relevant else test_cases[-max_cases:]
 
 # 세션 스테이트 초기화
@@ -173,30 +324,51 @@ if page == "test_cases":
     supabase = get_supabase_client()
     if supabase:
         try:
-            # 전체 데이터 조회
-            result = supabase.table('test_cases').select('*').order('id', desc=True).execute()
-
-            if result.data:
-                # 카테고리별 통계
-                categories = {}
-                for row in result.data:
-                    cat = row.get('category', '미분류')
-                    categories[cat] = categories.get(cat, 0) + 1
+            # 전체 개수/카테고리 통계 (서버 측 집계)
+            total_count = count_rows('test_cases') or 0
+
+            if total_count > 0:
+                categories = get_category_stats()
         
-                st.metric("전체 케이스 수", f"{len(result.data)}개")
+                st.metric("전체 케이스 수", f"{total_count}개")
         
                 with st.expander("📊 카테고리별 통계", expanded=False):
                     for cat, count in sorted(categories.items(), key=lambda x: x[1], reverse=True):
                         st.write(f"**{cat}**: {count}개")
 
+                # 전체 Excel 내보내기 (페이지 단위로 조회하며 바로 기록)
+                if EXCEL_AVAILABLE and st.button("📥 전체 테스트 케이스 Excel 만들기", key="export_all_tc"):
+                    with st.spinner(f"{total_count}개 케이스 내보내는 중..."):
+                        output, written = write_xlsx(
+                            ([test_case_export_row(row) for row in page] for page in iter_table_pages('test_cases')),
+                            TEST_CASE_EXPORT_COLUMNS,
+                            widths=[8, 25, 15] + TEST_CASE_COLUMN_WIDTHS + [25, 30, 40, 20]
+                        )
+                    st.download_button(
+                        label=f"📥 {written}개 케이스 다운로드",
+                        data=output,
+                        file_name=f"test_cases_all_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx",
+                        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+                    )
+
                 st.markdown("---")
 
+                # 페이지 크기 선택 (변경 시 첫 페이지로)
+                page_size = st.selectbox("페이지당 케이스 수", [50, 100, 200, 500], key="tc_page_size")
+                if st.session_state.get('tc_page_size_prev') != page_size:
+                    st.session_state.tc_page_size_prev = page_size
+                    st.session_state.tc_page_cursors = [None]
+
+                # 현재 페이지 조회 (keyset: 마지막으로 본 id 이전 행)
+                page_cursors = st.session_state.tc_page_cursors
+                page_rows, next_cursor, group_totals = load_test_cases_page(page_size=page_size, before_id=page_cursors[-1])
+
                 # group_id로 재조립
                 grouped_cases = {}
                 ungrouped_cases = []
         
-                # 전체 테스트 케이스 표시
-                for row in result.data:
+                # 현재 페이지 테스트 케이스 표시
+                for row in page_rows:
                     tc_data = row.get('data', {})  # JSONB에서 원본 데이터
                     group_id = tc_data.get('group_id')
 
@@ -223,9 +395,19 @@ if page == "test_cases":
 
                     # 그룹 내에서 id 기준 오름차순 정렬
                     rows = sorted(rows, key=lambda x: x['id'])
+
+                    # 페이지에 그룹 일부만 담겼으면 '전체 불러오기' 전까지 일부만 표시 (수정/삭제는 항상 그룹 전체 기준)
+                    full_group_key = f"full_group_{group_id}"
+                    if full_group_key in st.session_state:
+                        rows = st.session_state[full_group_key]
+                    group_total = max(group_totals.get(group_id) or 0, len(rows))
+                    partial = len(rows) < group_total
                     
                     # 그룹 제목
-                    group_title = f"[{category}] 📊 표 그룹 ({len(rows)}개)"
+                    if partial:
+                        group_title = f"[{category}] 📊 표 그룹 ({len(rows)}/{group_total}개 표시)"
+                    else:
+                        group_title = f"[{category}] 📊 표 그룹 ({len(rows)}개)"
 
                     # 고유 키 생성
                     unique_key = f"group_{first_id}_{idx}"
@@ -299,50 +481,23 @@ if page == "test_cases":
                             with col1:
                                 if st.button("💾 저장", key=f"save_{unique_key}", use_container_width=True):
                                     try:
-                                        # 기존 그룹 전체 삭제
-                                        for row in rows:
-                                            supabase.table('test_cases').delete().eq('id', row['id']).execute()
-
-                                        # 새로운 데이터로 다시 저장
-                                        new_table_data = []
-                                        for _, row in edited_df.iterrows():
-                                            # 빈 행 필터링 개선
-                                            if (pd.isna(row['CATEGORY']) or str(row['CATEGORY']).strip() == '') and \
-                                               (pd.isna(row['DEPTH 1']) or str(row['DEPTH 1']).strip() == ''):
-                                                continue
-                                            
-                                            new_table_data.append({
-                                                'NO': str(row['NO']),
-                                                'CATEGORY': str(row['CATEGORY']),
-                                                'DEPTH 1': str(row['DEPTH 1']),
-                                                'DEPTH 2': str(row['DEPTH 2']),
-                                                'DEPTH 3': str(row['DEPTH 3']),
-                                                'PRE-CONDITION': str(row['PRE-CONDITION']),
-                                                'STEP': str(row['STEP']),
-                                                'EXPECT RESULT': str(row['EXPECT RESULT'])
-                                            })
-
-                                        if new_table_data:
-                                            group_test = {
-                                                "group_id": group_id,
-                                                "input_type": input_type,
-                                                "category": category,
-                                                # "name": f"({len(new_table_data)}개)",
-                                                "category": "입력 그룹",
-                                                "table_data": new_table_data
-                                            }
+                                        # 위치별로 수정된 행 정리 (비워진 행은 None → 삭제 대상)
+                                        edited_rows = table_rows_from_frame(edited_df, keep_positions=True)
 
-                                            saved_count = save_test_case_to_supabase(group_test)
+                                        if any(edited_rows):
+                                            # 변경된 행만 반영
+                                            summary = save_table_group_changes(group_id, input_type, rows, edited_rows)
 
-                                            if saved_count > 0:
-                                                st.session_state.editing_test_case_id = None
-                                                # 세션 스테이트 정리
-                                                if edit_session_key in st.session_state:
-                                                    del st.session_state[edit_session_key]
-                                                st.success("✅ 수정되었습니다!")
-                                                st.rerun()
-                                            else:
-                                                st.error("❌ 저장 실패!")
+                                            st.session_state.editing_test_case_id = None
+                                            # 세션 스테이트 정리
+                                            if edit_session_key in st.session_state:
+                                                del st.session_state[edit_session_key]
+                                            st.session_state.pop(full_group_key, None)
+                                            st.success(
+                                                f"✅ 수정되었습니다! (수정 {summary['updated']}개, 추가 {summary['inserted']}개, "
+                                                f"삭제 {summary['deleted']}개, 변경 없음 {summary['unchanged']}개)"
+                                            )
+                                            st.rerun()
                                         else:
                                             st.warning("⚠️ 저장할 데이터가 없습니다. CATEGORY 또는 DEPTH 1을 입력하세요.")
                                     except Exception as e:
@@ -360,7 +515,13 @@ if page == "test_cases":
                             # 📖 보기 모드
                             st.write(f"**카테고리:** {category}")
                             st.write(f"**타입:** {input_type}")
-                            st.write(f"**개수:** {len(rows)}개")
+                            if partial:
+                                st.write(f"**개수:** 전체 {group_total}개 중 이 페이지의 {len(rows)}개")
+                                if st.button("📂 그룹 전체 불러오기", key=f"load_full_{unique_key}"):
+                                    st.session_state[full_group_key] = load_group_rows(group_id)
+                                    st.rerun()
+                            else:
+                                st.write(f"**개수:** {len(rows)}개")
 
                             # 표로 보여주기
                             df_data = []
@@ -388,19 +549,22 @@ if page == "test_cases":
                             # 수정 버튼
                             with col1:
                                 if st.button("✏️ 수정", key=f"edit_{unique_key}", use_container_width=True):
+                                    if partial:
+                                        # 일부만 보고 수정하면 나머지 행이 삭제 대상이 되므로 전체를 불러와서 수정
+                                        st.session_state[full_group_key] = load_group_rows(group_id)
                                     st.session_state.editing_test_case_id = unique_key
                                     st.rerun()
                             
                             # 삭제 버튼
                             with col2:
                                 if st.button("🗑️ 삭제", key=f"delete_{unique_key}", use_container_width=True):
-                                    try:
-                                        for row in rows:
-                                            supabase.table('test_cases').delete().eq('id', row['id']).execute()
+                                    # 그룹 전체 일괄 삭제 (다른 페이지에 있는 행 포함)
+                                    group_rows = load_group_rows(group_id) if partial else rows
+                                    success = delete_test_cases_from_supabase([row['id'] for row in group_rows])
+                                    st.session_state.pop(full_group_key, None)
+                                    if success:
                                         st.success("✅ 삭제되었습니다!")
                                         st.rerun()
-                                    except Exception as e:
-                                        st.error(f"❌ 삭제 실패: {str(e)}")
                 
                 # 그룹 없는 케이스 (줄글 형식 등)            
                 if ungrouped_cases:
@@ -424,12 +588,14 @@ if page == "test_cases":
                                 with col1:
                                     if st.button("💾 저장", key=f"save_tc_{row['id']}", use_container_width=True):
                                         try:
-                                            supabase.table('test_cases').update({
+                                            updates = {
                                                 'category': edited_category,
                                                 'name': edited_name,
                                                 'description': edited_desc,
                                                 'link': edited_link
-                                            }).eq('id', row['id']).execute()
+                                            }
+                                            supabase.table('test_cases').update(updates).eq('id', row['id']).execute()
+                                            notify_replica('test_cases', updates={row['id']: updates})
                                             
                                             st.session_state.editing_test_case_id = None
                                             st.success("✅ 수정되었습니다!")
@@ -472,6 +638,20 @@ if page == "test_cases":
                                             st.success("✅ 삭제되었습니다!")
                                             st.rerun()
 
+                # 페이지 이동
+                st.markdown("---")
+                col_prev, col_page, col_next = st.columns([1, 2, 1])
+                with col_prev:
+                    if st.button("◀ 이전", disabled=len(page_cursors) == 1, use_container_width=True):
+                        page_cursors.pop()
+                        st.rerun()
+                with col_page:
+                    st.markdown(f"<div style='text-align: center'>{len(page_cursors)} 페이지</div>", unsafe_allow_html=True)
+                with col_next:
+                    if st.button("다음 ▶", disabled=next_cursor is None, use_container_width=True):
+                        page_cursors.append(next_cursor)
+                        st.rerun()
+
             else:
                 st.info("아직 저장된 테스트 케이스가 없습니다.")
 
@@ -492,14 +672,14 @@ elif page == "spec_docs":
     supabase = get_supabase_client()
     if supabase:
         try:
-            result = supabase.table('spec_docs').select('*').order('id', desc=True).execute()
+            spec_docs = load_spec_docs_from_supabase()
 
-            if result.data:
-                st.metric("전체 문서 수", f"{len(result.data)}개")
+            if spec_docs:
+                st.metric("전체 문서 수", f"{len(spec_docs)}개")
                 st.markdown("---")
 
                 # 전체 기획 문서 표시
-                for row in result.data:
+                for row in spec_docs:
                     with st.expander(f"[{row.get('doc_type', '기타')}] {row.get('title', '제목 없음')}", expanded=False):
 
                         is_editing = st.session_state.editing_spec_doc_id == row['id']
@@ -516,12 +696,14 @@ elif page == "spec_docs":
                             with col1:
                                 if st.button("💾 저장", key=f"save_spec_{row['id']}", use_container_width=True):
                                     try:
-                                        supabase.table('spec_docs').update({
+                                        updates = {
                                             'title': edited_title,
                                             'doc_type': edited_type,
                                             'link': edited_link,
                                             'content': edited_content
-                                        }).eq('id', row['id']).execute()
+                                        }
+                                        supabase.table('spec_docs').update(updates).eq('id', row['id']).execute()
+                                        notify_replica('spec_docs', updates={row['id']: updates})
 
                                         st.session_state.editing_spec_doc_id = None
                                         st.success("✅ 수정되었습니다!")
@@ -553,6 +735,7 @@ elif page == "spec_docs":
                                 if st.button("🗑️ 삭제", key=f"delete_spec_{row['id']}", use_container_width=True):
                                     try:
                                         supabase.table('spec_docs').delete().eq('id', row['id']).execute()
+                                        notify_replica('spec_docs', deleted_ids=[row['id']])
                                         st.success("✅ 삭제되었습니다!")
                                         st.rerun()
                                     except Exception as e:
@@ -676,22 +859,8 @@ else:
                         # 그룹 ID 생성
                         group_id = f"table_group_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
         
-                        # 표 데이터 준비
-                        table_data = []
-                        for index, row in edited_df.iterrows():
-                            if pd.isna(row['CATEGORY']) or row['CATEGORY'] == '' or pd.isna(row['DEPTH 1']) or row['DEPTH 1'] == '':
-                                continue
-            
-                            table_data.append({
-                                'NO': str(row['NO']) if row['NO'] and str(row['NO']).strip() else '',
-                                'CATEGORY': str(row['CATEGORY']),
-                                'DEPTH 1': str(row['DEPTH 1']),
-                                'DEPTH 2': str(row.get('DEPTH 2', '')),
-                                'DEPTH 3': str(row.get('DEPTH 3', '')),
-                                'PRE-CONDITION': str(row.get('PRE-CONDITION', '')),
-                                'STEP': str(row.get('STEP', '')),
-                                'EXPECT RESULT': str(row.get('EXPECT RESULT', ''))
-                            })
+                        # 표 데이터 준비 (CATEGORY, DEPTH 1이 빈 행 제외)
+                        table_data = table_rows_from_frame(edited_df)
         
                         if table_data:
                             # Supabase에 저장 (개별 케이스로 쪼갬!)
@@ -806,29 +975,89 @@ else:
                 st.markdown("**방법 3: CSV/Excel 파일 업로드**")
                 uploaded_file = st.file_uploader("CSV 또는 Excel 파일 선택", type=['csv', 'xlsx'], key="upload_tc")
                 
-                if uploaded_file is not None:
+                if uploaded_file is not None and uploaded_file.size > STREAMING_UPLOAD_MB * 1024 * 1024:
+                    # 대용량 파일: 전체를 표로 올리지 않고 묶음 단위로 읽어서 바로 저장 대기열에 등록
+                    # (세션에는 미리보기만 보관)
+                    upload_key = (uploaded_file.name, uploaded_file.size)
+                    try:
+                        if st.session_state.get('upload_preview_key') != upload_key:
+                            st.session_state.upload_preview = next(
+                                iter_table_chunks(uploaded_file, uploaded_file.name, chunksize=20),
+                                pd.DataFrame(columns=TABLE_COLUMNS)
+                            )
+                            st.session_state.upload_preview_key = upload_key
+
+                        st.info(
+                            f"📦 대용량 파일({uploaded_file.size / 1024 / 1024:.1f}MB)은 편집 없이 바로 저장됩니다. "
+                            "아래는 처음 20행 미리보기예요."
+                        )
+                        st.dataframe(st.session_state.upload_preview, use_container_width=True, hide_index=True)
+
+                        if st.button("📥 백그라운드로 저장", key="stream_upload_tc"):
+                            ingest_queue = get_ingest_queue()
+                            job_id = ingest_queue.create_job(
+                                f"table_group_{datetime.now().strftime('%Y%m%d_%H%M%S')}",
+                                uploaded_file.name
+                            )
+                            queued = 0
+                            try:
+                                with st.spinner("파일을 나눠 읽으며 저장 대기열에 등록 중..."):
+                                    for chunk in iter_table_chunks(uploaded_file, uploaded_file.name):
+                                        rows = table_rows_from_frame(chunk)
+                                        ingest_queue.add_rows(job_id, rows)
+                                        queued += len(rows)
+                            except Exception as e:
+                                # 일부만 읽힌 파일을 완료로 표시하지 않음 (남은 묶음 취소)
+                                ingest_queue.abort_job(job_id, f"파일 읽기 중단 ({queued}행까지 등록): {str(e)}")
+                                raise
+                            ingest_queue.close_job(job_id)
+
+                            if queued:
+                                st.success(f"📥 {queued}개 행을 저장 대기열에 등록했습니다. 아래에서 진행 상황을 확인하세요.")
+                            else:
+                                st.warning("유효한 테스트 케이스가 없습니다. CATEGORY와 DEPTH 1은 필수 항목입니다.")
+
+                    except Exception as e:
+                        st.error(f"파일 읽기 오류: {str(e)}")
+
+                elif uploaded_file is not None:
                     try:
                         if uploaded_file.name.endswith('.csv'):
                             df = pd.read_csv(uploaded_file)
                         else:
                             df = pd.read_excel(uploaded_file)
                         
-                        required_columns = ['NO', 'CATEGORY', 'DEPTH 1', 'DEPTH 2', 'DEPTH 3', 'PRE-CONDITION', 'STEP', 'EXPECT RESULT']
-                        
-                        if not all(col in df.columns for col in required_columns):
+                        if missing_columns(df):
                             st.warning("컬럼명이 일치하지 않습니다. 데이터를 확인해주세요.")
                             st.dataframe(df.head())
                         else:
-                            # st.session_state.edit_df = df[required_columns].fillna('')
-                            
                             # 모든 컬럼을 문자열로 변환 후 빈 값 처리
-                            st.session_state.edit_df = df[required_columns].astype(str).replace('nan', '').replace('None', '')
+                            st.session_state.edit_df = clean_table_frame(df)
                             st.success(f"✅ {len(df)}개 행이 로드되었습니다!")
                             st.info("👆 방법 1 로 올라가 '💾 표 형식 저장' 버튼을 눌러주세요!")
+
+                            # 대량 파일: 편집 없이 백그라운드 저장 (창을 닫아도 계속 진행)
+                            if st.button("📥 편집 없이 백그라운드로 저장", key="ingest_upload_tc"):
+                                rows = table_rows_from_frame(st.session_state.edit_df)
+                                if rows:
+                                    get_ingest_queue().enqueue(
+                                        f"table_group_{datetime.now().strftime('%Y%m%d_%H%M%S')}",
+                                        uploaded_file.name,
+                                        rows
+                                    )
+                                    st.success(f"📥 {len(rows)}개 행을 저장 대기열에 등록했습니다. 아래에서 진행 상황을 확인하세요.")
+                                else:
+                                    st.warning("유효한 테스트 케이스가 없습니다. CATEGORY와 DEPTH 1은 필수 항목입니다.")
                             
                     except Exception as e:
                         st.error(f"파일 읽기 오류: {str(e)}")
 
+                # 대량 저장 진행 상황 (처리 중인 작업이 있으면 3초마다 이 영역만 새로고침)
+                ingest_jobs = get_ingest_queue().list_jobs(limit=10)
+                if ingest_jobs:
+                    ingest_active = any(job['status'] in ('open', 'queued') for job in ingest_jobs)
+                    st.fragment(render_ingest_panel, run_every="3s" if ingest_active else None)()
+
             st.markdown("<br>", unsafe_allow_html=True)
             st.markdown("<br>", unsafe_allow_html=True)
             st.markdown("<br>", unsafe_allow_html=True)
@@ -842,17 +1071,13 @@ else:
             supabase = get_supabase_client()
             if supabase:
                 try:
-                    # 전체 개수
-                    result = supabase.table('test_cases').select('id, category, data').execute()
-                    total_count = len(result.data)
+                    # 전체 개수 (서버 측 count)
+                    total_count = count_rows('test_cases') or 0
                     st.metric("Supabase 전체 케이스 수", f"{total_count}개 +α")
 
                     # 카테고리별 통계
                     if total_count > 0:
-                        categories = {}
-                        for row in result.data:
-                            cat = row.get('category', '미분류')
-                            categories[cat] = categories.get(cat, 0) + 1
+                        categories = get_category_stats()
 
                         with st.expander("📊 카테고리별 통계", expanded=False):
                             for cat, count in sorted(categories.items(), key=lambda x: x[1], reverse=True):
@@ -889,6 +1114,97 @@ else:
                                 st.write(f"✅ {model.name}")
                     except Exception as e:
                         st.error(f"오류: {str(e)}")
+
+                # 로컬 벡터 인덱스 vs RPC 비교
+                benchmark_query = st.text_input("벡터 검색 비교용 검색어", key="benchmark_query")
+                if st.button("⏱️ 로컬 인덱스 vs RPC 비교") and benchmark_query:
+                    try:
+                        bench = compare_vector_search(benchmark_query)
+                        st.write(f"재현율: {bench['recall']:.0%} (RPC {bench['rpc_count']}개 / 로컬 {bench['local_count']}개)")
+                        st.write(f"응답 시간: RPC {bench['rpc_ms']:.1f}ms / 로컬 {bench['local_ms']:.1f}ms")
+                    except Exception as e:
+                        st.error(f"오류: {str(e)}")
+
+                # 임베딩 캐시 통계
+                cache_stats = get_embedding_cache().stats()
+                st.write("### 임베딩 캐시:")
+                st.write(f"히트 {cache_stats['hits']}회 / 미스 {cache_stats['misses']}회 (히트율 {cache_stats['hit_rate']:.0%})")
+
+                # 검색어 임베딩 캐시 통계
+                query_cache_stats = get_query_embedding_cache().stats()
+                st.write("### 검색어 임베딩 캐시:")
+                st.write(f"히트 {query_cache_stats['hits']}회 / 미스 {query_cache_stats['misses']}회 (히트율 {query_cache_stats['hit_rate']:.0%})")
+
+                # Gemini 호출 지표
+                gemini_api = get_gemini_api()
+                if gemini_api:
+                    st.write("### Gemini 호출:")
+                    for operation, metrics in gemini_api.stats().items():
+                        st.write(
+                            f"{operation}: 호출 {metrics['calls']}회 / 재시도 {metrics['retries']}회 / 실패 {metrics['failures']}회, "
+                            f"평균 {metrics['avg_latency_seconds']:.1f}초, 속도 제한 대기 {metrics['throttled_seconds']:.1f}초"
+                        )
+                        if metrics['last_error']:
+                            st.caption(f"마지막 오류: {metrics['last_error']}")
+
+                # 로컬 복제본 동기화 상태
+                replica = get_local_replica()
+                if replica:
+                    st.write("### 로컬 복제본:")
+                    replica_status = replica.status()
+                    for table_name, state in replica_status['tables'].items():
+                        st.write(
+                            f"{table_name}: {state['rows']:,}행, 최고 id {state['high_water_id']}, "
+                            f"마지막 동기화 {state['synced_at'] or '진행 중'}, 마지막 전체 비교 {state['reconciled_at'] or '진행 전'}"
+                        )
+                    st.caption(f"삭제 기록(tombstone) {replica_status['tombstones']:,}건")
+                    st.caption(
+                        f"다른 곳(Supabase 대시보드, 다른 배포 등)에서 추가/수정/삭제된 행은 "
+                        f"전체 비교 주기({(replica_status['reconcile_seconds'] or 0) // 60}분)마다 반영됩니다."
+                    )
+                    if replica_status['last_error']:
+                        st.caption(f"마지막 오류: {replica_status['last_error']}")
+                    if st.button("🔄 지금 동기화", key="replica_sync_now"):
+                        replica.request_sync()
+                        st.info("동기화를 요청했습니다. 잠시 후 새로고침하세요.")
+
+                # 전체 데이터 내보내기 (백업 / 오프라인 분석 / 로컬 인덱스 초기 데이터)
+                st.write("### 전체 데이터 내보내기:")
+                export_tables = st.multiselect("테이블", ['test_cases', 'spec_docs'], default=['test_cases', 'spec_docs'], key="export_tables")
+                export_format = st.radio("형식", ['parquet', 'jsonl'], horizontal=True, key="export_format")
+                export_embeddings = st.checkbox("임베딩 포함 (float32)", value=False, key="export_embeddings")
+                if st.button("🗄️ 내보내기", key="export_corpus") and export_tables:
+                    st.session_state.export_reports = []
+                    for table_name in export_tables:
+                        try:
+                            progress_text = st.empty()
+                            report = export_table(
+                                table_name,
+                                fmt=export_format,
+                                include_embeddings=export_embeddings,
+                                on_page=lambda rows, name=table_name: progress_text.write(f"{name}: {rows:,}행 기록 중...")
+                            )
+                            progress_text.empty()
+                            st.session_state.export_reports.append((table_name, report))
+                        except Exception as e:
+                            st.error(f"{table_name} 내보내기 실패: {str(e)}")
+
+                # 내보낸 파일 다운로드 (서버에 저장된 파일을 브라우저로 받기, 다운로드 클릭 rerun 후에도 유지)
+                for table_name, report in st.session_state.get('export_reports', []):
+                    st.write(
+                        f"✅ {table_name}: {report['rows']:,}행, {report['bytes'] / 1024 / 1024:.1f}MB, "
+                        f"{report['seconds']:.1f}초 ({report['rows_per_sec']:,.0f}행/초, {report['mb_per_sec']:.1f}MB/초)"
+                    )
+                    if os.path.exists(report['path']):
+                        with open(report['path'], 'rb') as export_file:
+                            st.download_button(
+                                f"📥 {os.path.basename(report['path'])} 다운로드",
+                                data=export_file,
+                                file_name=os.path.basename(report['path']),
+                                mime="application/vnd.apache.parquet" if report['path'].endswith('.parquet') else "application/x-ndjson",
+                                key=f"export_download_{report['path']}"
+                            )
+                    st.caption(f"서버 저장 위치: {report['path']}")
         
         # ============================================
         # 📚 탭 2: 기획 문서 추가
@@ -982,8 +1298,7 @@ else:
             supabase = get_supabase_client()
             if supabase:
                 try:
-                    result = supabase.table('spec_docs').select('id, title, doc_type').execute()
-                    total_count = len(result.data)
+                    total_count = count_rows('spec_docs') or 0
                     st.metric("전체 문서 수", f"{total_count}개")
 
                     # 새 탭으로 열기 링크
@@ -1013,8 +1328,8 @@ else:
         supabase = get_supabase_client()
         if supabase:
             try:
-                tc_count = len(supabase.table('test_cases').select('id').execute().data)
-                doc_count = len(supabase.table('spec_docs').select('id').execute().data)
+                tc_count = count_rows('test_cases') or 0
+                doc_count = count_rows('spec_docs') or 0
 
                 if tc_count == 0 and doc_count == 0:
                     st.warning("⚠️ 먼저 테스트 케이스나 기획 문서를 추가해주세요!")
@@ -1031,198 +1346,140 @@ else:
             key="search_input"
         )
             
+        col_stream, col_shard, col_force = st.columns(3)
+        with col_stream:
+            stream_mode = st.checkbox("⚡ 생성되는 테스트 케이스 실시간으로 보기", value=True, key="stream_mode")
+        with col_shard:
+            shard_option = st.checkbox(
+                "🧩 대량 생성 모드 (섹션별 병렬 생성)",
+                value=False,
+                key="shard_mode",
+                help=f"요청에 {SHARD_MIN_CASES}개 이상을 적으면 자동으로 사용돼요."
+            )
+        with col_force:
+            force_regenerate = st.checkbox("🔄 캐시 무시하고 새로 생성", value=False, key="force_regenerate")
+
+        background_mode = st.checkbox(
+            "🕒 백그라운드로 실행 (생성 중에도 다른 작업 가능)",
+            value=True,
+            key="background_mode",
+            help="여러 요청을 연달아 등록할 수 있고, 진행 상황과 생성 중인 케이스는 아래 작업 목록에서 확인할 수 있어요. "
+                 "작업 목록은 브라우저 세션 기준이라 새로고침하면 보이지 않아요."
+        )
+
         if st.button("AI 추천 받기", type="primary"):
+            shard_mode = shard_option or requested_case_count(search_query) >= SHARD_MIN_CASES
             if search_query:
-                with st.spinner("AI가 유사한 케이스를 검색중이에요. 1분 ~ 최대 5분 소요될 수 있어요🥹"):
-                    client = get_gemini_client()
-                    
-                    if client:
-                        # 벡터 유사도 검색
-                        try:
-                            # 1. Supabase에서 유사한 테스트 케이스 검색
-                            with st.spinner("벡터 유사도 계산 중..."):
-                                relevant_cases = search_similar_test_cases(
-                                    query=search_query,
-                                    limit=50,
-                                    similarity_threshold=0.3  # 30% 이상 유사도
-                                )
-
-                                # 세션 스테이트에 저장
-                                st.session_state.relevant_cases = relevant_cases
-                                
-                            if relevant_cases:
-                                st.info(f"📊 {len(relevant_cases)}개의 유사한 테스트 케이스를 발견했습니다!")
-
-                                # 유사도 정보 표시
-                                with st.expander("🔍 검색된 케이스 미리보기", expanded=False):
-                                    for idx, tc in enumerate(relevant_cases[:5], 1):  # 상위 5개만
-                                        similarity = tc.get('similarity', 0)
-                                        st.write(f"{idx}. **{tc.get('name')}** (유사도: {similarity:.2%})")
-
-                            else:
-                                st.warning("⚠️ 유사한 테스트 케이스를 찾지 못했습니다. 일반 케이스로 진행합니다.")
-                                # 벡터 검색 실패 시 최신 50개
-                                all_cases = load_test_cases_from_supabase(limit=50)
-                                relevant_cases = all_cases
-                                
-                                # 세션 스테이트에 저장
-                                st.session_state.relevant_cases = all_cases
-
-                            # 2. 기획 문서도 벡터 검색
-                            spec_docs_str = ""
-                            spec_docs = search_similar_spec_docs(query=search_query, limit=10)
-
-                            if spec_docs:
-                                st.info(f"📚 {len(spec_docs)}개의 관련 기획 문서를 발견했습니다!")
-                                spec_docs_str = "\n\n=== 관련 기획 문서 ===\n"
-                                for doc in spec_docs:
-                                    spec_docs_str += f"\n[문서 제목: {doc['title']}]\n[문서 유형: {doc['doc_type']}]\n[유사도: {doc.get('similarity', 0):.2%}]\n[내용]\n{doc['content'][:500]}...\n\n---\n"
-
-                            # 3. AI 프롬프트용 데이터 준비
-                            test_cases_str = json.dumps(
-                                [
-                                    {
-                                        "id": tc.get("id"),
-                                        "category": tc.get("category"),
-                                        "name": tc.get("name"),
-                                        "description": tc.get("description"),
-                                        "data": tc.get("data"),
-                                        "similarity": tc.get("similarity")
-                                    }
-                                    for tc in relevant_cases
-                                ],
-                                ensure_ascii=False,
-                                indent=2
-                            )
-                            
-                        except Exception as e:
-                            st.error(f"❌ 벡터 검색 실패: {str(e)}")
-                            st.warning("키워드 검색으로 전환합니다...")
-
-                            # Fallback: 최신 50개
-                            relevant_cases = load_test_cases_from_supabase(limit=50)
-                            test_cases_str = json.dumps(relevant_cases, ensure_ascii=False, indent=2)
-                            spec_docs_str = ""
-
+                client = get_gemini_client()
+
+                if client and background_mode:
+                    # 백그라운드 작업으로 등록 (rerun/탭 이동과 무관하게 진행)
+                    get_job_queue().submit(
+                        get_job_owner(),
+                        search_query.strip().splitlines()[0][:40],
+                        recommendation_job,
+                        client,
+                        get_response_cache(),
+                        search_query,
+                        shard_mode=shard_mode,
+                        force_regenerate=force_regenerate
+                    )
+                    st.toast("🕒 작업을 등록했어요. 아래 작업 목록에서 진행 상황을 확인하세요.")
+
+                elif client:
+                    with st.spinner("AI가 유사한 케이스를 검색중이에요. 1분 ~ 최대 5분 소요될 수 있어요🥹"):
+                        progress_bar = st.progress(0.0, text="대기 중")
+                        context_area = st.container()
+                        stream_header = st.empty()
+                        stream_placeholder = st.empty()
+                        streamed_rows = []
+
+                        def on_context(relevant_cases, spec_docs, prompt_stats, fallback):
                             # 세션 스테이트에 저장
                             st.session_state.relevant_cases = relevant_cases
-                        
-                        # 4. AI 프롬프트 (기존과 동일)
-                        prompt = f"""[역할 부여]
-너는 나와 같이 IT 노코드 웹 빌더 SaaS에 다니고 있는 꼼꼼한 QA 전문가, QA 엔지니어야.
-(1) 테스트 설계, 테스트 케이스 작성, 자동화 업무 수행
-(3) 서비스 안정성 기여. 리그레이션을 중심 업무 수행
-
-확실하지 않은 정보는 '추정' 또는 '불확실'하다고 명시하고, 최신 정보가 필요한 경우 그렇게 알려줘.
-혹시나 실제 고객, 회원 이름이 들어간 문서가 있다면, 실제 이름 대신 'Customer A, B, C'를 사용해. 또는 '홍길동', '김영희'와 같은 가명을 사용해줘.
-개인정보나 기밀 정보는 일반화하여 처리해.
-
-[제품 정보]
-1. IO: 서비스 메인 페이지. 서비스 이용자는 IO에서 회원가입, 로그인을 하고 본인 소유 사이트를 관리 등을 함.
-2. BO: Back Office. 사이트 관리자가 접속해서 사이트를 관리하는 공간 (쇼핑몰 세팅, 예약 기능 세팅, 컨텐츠 관리 등). 관리자 페이지에서 '디자인 모드'에 접속할 수 있음.
-3. DM: 디자인 모드(Design Mode). 사이트 관리자가 접속해서 사이트를 디자인하는 공간 (상품 상세페이지 디자인 설정, 메뉴 추가/삭제, 메뉴 안에 위젯 추가/삭제 등)
-4. FO: Front Office. 실제 사이트 방문자(엔드유저)가 상품을 보고 구매하거나, 예약하거나, 게시글을 보는 곳
-
-[요청]
-"{search_query}"에 대한 테스트 케이스 작성
-
-[학습 데이터]
-다음은 현재 시스템에 등록된 테스트 케이스들입니다:
-{test_cases_str}
-
-{spec_docs_str}
-
-[테스트 케이스 표 양식]
-반드시 다음 양식을 따라서 테스트 케이스를 작성해줘:
-| NO | CATEGORY | DEPTH 1 | DEPTH 2 | DEPTH 3 | PRE-CONDITION | STEP | EXPECT RESULT |
-
-사용자의 요청을 분석하고, 다음을 수행할 것:
-1. 사용자가 테스트하려는 기능과 **직접 관련된** 테스트 케이스를 찾을 것
-2. 기획 문서를 참고하여 기능의 의도와 맥락을 파악할 것
-3. 그 기능이 작동하기 위해 **의존하는 다른 기능**들을 추론할 것
-4. 논리적인 순서로 테스트 체크리스트를 만들 것
-5. **반드시 위 표 양식으로 신규 테스트 케이스들을 생성할 것. NO 1부터 번호 시작**
-6. **existing_test_cases의 id는 반드시 숫자여야 함. 학습 데이터의 id 필드를 참조할 것**
-
-응답 형식:
-```json
-{{
-  "reasoning": "왜 이런 테스트 케이스들이 필요한지 단계별 추론 과정 (한국어로 설명)",
-  "existing_test_cases": [
-    {{
-      "id": 테스트케이스 숫자 ID (예: 1, 2, 3),
-      "reason": "이 기존 테스트가 왜 필요한지 간단한 설명"
-    }}
-  ],
-  "new_test_cases": [
-    {{
-      "no": 번호,
-      "category": "카테고리",
-      "depth1": "대분류",
-      "depth2": "중분류 또는 빈 문자열",
-      "depth3": "소분류 또는 빈 문자열",
-      "pre_condition": "사전조건 또는 빈 문자열",
-      "step": "수행 단계",
-      "expect_result": "예상 결과"
-    }}
-  ],
-  "test_order": "추천하는 테스트 순서 설명",
-  "additional_suggestions": "추가로 필요할 수 있는 테스트 제안(edge case)"
-}}
-```
-
-중요: 
-1. 반드시 JSON 형식으로만 응답
-2. new_test_cases는 반드시 표 양식에 맞춰 작성
-3. 벡터 검색으로 찾은 유사 케이스를 충분히 활용할 것
-"""
-
-                        # 5. AI 응답 처리
-                        try:
-                            response = client.generate_content(prompt)
-                            response_text = response.text
-                                        
-                            # JSON 파싱
-                            if "```json" in response_text:
-                                json_str = response_text.split("```json")[1].split("```")[0].strip()
-                            else:
-                                json_str = response_text.strip()
 
-                            import re
-                            json_str_cleaned = re.sub(r'[\x00-\x08\x0b\x0c\x0e-\x1f\x7f-\x9f]', '', json_str)
+                            with context_area:
+                                if fallback:
+                                    st.warning("⚠️ 유사한 테스트 케이스를 찾지 못했습니다. 일반 케이스로 진행합니다.")
+                                else:
+                                    st.info(f"📊 {len(relevant_cases)}개의 유사한 테스트 케이스를 발견했습니다!")
+
+                                    # 유사도 정보 표시
+                                    with st.expander("🔍 검색된 케이스 미리보기", expanded=False):
+                                        for idx, tc in enumerate(relevant_cases[:5], 1):  # 상위 5개만
+                                            similarity = tc.get('similarity', 0)
+                                            if tc.get('lexical_score'):
+                                                st.write(f"{idx}. **{tc.get('name')}** (유사도: {similarity:.2%}, 키워드 일치)")
+                                            else:
+                                                st.write(f"{idx}. **{tc.get('name')}** (유사도: {similarity:.2%})")
 
-                            try:
-                                ai_response = json.loads(json_str_cleaned)
-                            except json.JSONDecodeError as e:
-                                st.error(f"❌ JSON 파싱 오류: {str(e)}")
-
-                                with st.expander("🔧 디버깅 정보 (개발자용)", expanded=False):
-                                    st.write(f"**오류 위치:** line {e.lineno}, column {e.colno}")
-                                    st.write(f"**오류 메시지:** {e.msg}")
-                                    st.code(json_str_cleaned[:1000], language="json")
-
-                                try:
-                                    json_str_final = json_str_cleaned.replace('\n', ' ').replace('\r', ' ').replace('\t', ' ')
-                                    json_str_final = re.sub(r'\s+', ' ', json_str_final)
-                                    ai_response = json.loads(json_str_final)
-                                    st.warning("⚠️ JSON 파싱에 문제가 있어 일부 데이터가 손실되었을 수 있습니다.")
-                                except:
-                                    st.error("❌ AI 응답을 처리할 수 없습니다. 다시 시도해주세요.")
-                                    st.stop()
-
-                            st.session_state.search_history.append({
-                                "query": search_query,
-                                "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                                "response": ai_response
-                            })
+                                if spec_docs:
+                                    st.info(f"📚 {len(spec_docs)}개의 관련 기획 문서를 발견했습니다!")
 
-                            st.session_state.last_ai_response = ai_response
-                            st.success("✅ AI 분석이 완료되었습니다!")
+                                st.caption(
+                                    f"📦 프롬프트: 케이스 {prompt_stats['cases']}/{prompt_stats['total_cases']}개, "
+                                    f"기획 문서 {prompt_stats['docs']}/{prompt_stats['total_docs']}개, "
+                                    f"약 {prompt_stats['prompt_tokens']:,} 토큰"
+                                )
+
+                        def on_cases(cases):
+                            # 케이스가 완성될 때마다 표에 바로 추가
+                            stream_header.markdown("### ⏳ 생성 중인 테스트 케이스")
+                            streamed_rows.extend(ai_case_to_table_row(tc) for tc in cases)
+                            stream_placeholder.dataframe(
+                                pd.DataFrame(streamed_rows),
+                                use_container_width=True,
+                                hide_index=True
+                            )
 
+                        try:
+                            result = run_recommendation(
+                                client,
+                                get_response_cache(),
+                                search_query,
+                                shard_mode=shard_mode,
+                                stream=stream_mode,
+                                force_regenerate=force_regenerate,
+                                report=lambda progress, message: progress_bar.progress(progress, text=message),
+                                on_context=on_context,
+                                on_cases=on_cases
+                            )
                         except Exception as e:
                             st.error(f"❌ AI 분석 중 오류가 발생했습니다: {str(e)}")
+                            st.stop()
+
+                        progress_bar.empty()
+                        for error in result['errors']:
+                            st.warning(error)
+                        ai_response = result['ai_response']
+
+                        if ai_response is None:
+                            st.error("❌ AI 응답을 처리할 수 없습니다. 다시 시도해주세요.")
+                            with st.expander("🔧 디버깅 정보 (개발자용)", expanded=False):
+                                st.write(result['issues'])
+                                st.code(result['response_text'][:1000], language="json")
+                            st.stop()
+
+                        if result['from_cache']:
+                            # 같은 요청 + 같은 학습 데이터 → 이전 결과 재사용
+                            st.info("♻️ 같은 요청의 이전 결과를 불러왔습니다. 새로 생성하려면 '캐시 무시하고 새로 생성'을 체크하세요.")
+
+                        if result['issues']:
+                            st.warning(f"⚠️ AI 응답 일부를 보정했습니다. ({len(result['issues'])}건)")
+                            with st.expander("🔧 디버깅 정보 (개발자용)", expanded=False):
+                                for issue in result['issues']:
+                                    st.write(f"- {issue}")
+
+                        apply_recommendation_result(search_query, result)
+                        st.success("✅ AI 분석이 완료되었습니다!")
             else:
                 st.warning("검색어를 입력해주세요.")
+
+        # 백그라운드 작업 목록 (진행 중인 작업이 있으면 2초마다 이 영역만 새로고침)
+        recommendation_jobs = get_job_queue().list(owner=get_job_owner())
+        if recommendation_jobs:
+            job_active = any(job['status'] in ('queued', 'running') for job in recommendation_jobs)
+            st.fragment(render_job_panel, run_every="2s" if job_active else None)()
                     
 
         # ✅ 버튼 클릭 블록 밖에서 세션 체크
@@ -1235,18 +1492,7 @@ else:
             if ai_response.get("new_test_cases"):
                 st.markdown("### AI가 생성한 신규 테스트 케이스")
                 
-                df_data = []
-                for tc in ai_response.get("new_test_cases", []):
-                    df_data.append({
-                        "NO": tc.get("no", ""),
-                        "CATEGORY": tc.get("category", ""),
-                        "DEPTH 1": tc.get("depth1", ""),
-                        "DEPTH 2": tc.get("depth2", ""),
-                        "DEPTH 3": tc.get("depth3", ""),
-                        "PRE-CONDITION": tc.get("pre_condition", ""),
-                        "STEP": tc.get("step", ""),
-                        "EXPECT RESULT": tc.get("expect_result", "")
-                    })
+                df_data = [ai_case_to_table_row(tc) for tc in ai_response.get("new_test_cases", [])]
                 
                 df = pd.DataFrame(df_data)
                 
@@ -1260,26 +1506,7 @@ else:
 
                 with col1:
                     if EXCEL_AVAILABLE:
-                        output = BytesIO()
-                        with pd.ExcelWriter(output, engine='openpyxl') as writer:
-                            df.to_excel(writer, index=False, sheet_name='테스트케이스')
-                            workbook = writer.book
-                            worksheet = writer.sheets['테스트케이스']
-                        
-                            header_fill = PatternFill(start_color='4A90A4', end_color='4A90A4', fill_type='solid')
-                            header_font = Font(bold=True, color='FFFFFF')
-                            center_alignment = Alignment(horizontal='center', vertical='center', wrap_text=True)
-                        
-                            for cell in worksheet[1]:
-                                cell.fill = header_fill
-                                cell.font = header_font
-                                cell.alignment = center_alignment
-                        
-                            column_widths = {'A': 5, 'B': 15, 'C': 15, 'D': 20, 'E': 20, 'F': 30, 'G': 40, 'H': 40}
-                            for column, width in column_widths.items():
-                                worksheet.column_dimensions[column].width = width
-                    
-                        output.seek(0)
+                        output, _ = write_xlsx([df_data], TABLE_COLUMNS, widths=TEST_CASE_COLUMN_WIDTHS)
                         st.download_button(
                             label="📥 테스트 케이스 Excel로 다운로드",
                             data=output,
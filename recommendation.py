@@ -0,0 +1,158 @@
+# recommendation.py
+"""
+AI 추천 파이프라인 (검색 → 프롬프트 → 생성 → 파싱 → 결과 캐시)
+- 화면 출력 없이 콜백으로만 진행 상황을 알림 → 화면에서 바로 실행 / 백그라운드 작업 둘 다 사용
+- 검색/임베딩 중 오류·경고 메시지도 화면에 바로 찍지 않고 결과의 errors로 돌려줌
+"""
+
+from gemini_helpers import (
+    StreamingCaseParser,
+    stream_text,
+    build_recommendation_prompt,
+    PROMPT_TEMPLATE_VERSION,
+    STRUCTURED_GENERATION_CONFIG,
+    parse_recommendation_response,
+    generate_sharded,
+    requested_case_count
+)
+from response_cache import make_response_key
+from supabase_helpers import collect_messages, load_test_cases_from_supabase, search_test_cases_and_spec_docs
+
+
+def _ignore(*args):
+    pass
+
+
+def run_recommendation(
+    client,
+    response_cache,
+    query,
+    shard_mode=False,
+    stream=True,
+    force_regenerate=False,
+    report=None,
+    on_context=None,
+    on_cases=None
+):
+    """
+    AI 추천 실행
+
+    Args:
+        client: Gemini GenerativeModel
+        response_cache (ResponseCache): 결과 캐시
+        query (str): 검색어(요청 내용)
+        shard_mode (bool): 섹션별 병렬 생성 사용 여부
+        stream (bool): 스트리밍 생성 여부 (shard_mode가 아닐 때)
+        force_regenerate (bool): 캐시 무시 여부
+        report (callable): 진행률 콜백 (progress 0~1, 메시지)
+        on_context (callable): 검색 완료 시 호출 (테스트 케이스, 기획 문서, 프롬프트 통계, 최신 케이스 대체 여부)
+        on_cases (callable): 생성된 케이스가 나올 때마다 호출 (케이스 리스트)
+
+    Returns:
+        dict: query, ai_response(실패 시 None), issues, response_text, relevant_cases, spec_docs, prompt_stats, from_cache,
+              errors(검색/임베딩 중 발생한 오류·경고 메시지)
+
+    Raises:
+        Exception: 생성 실패 시 (모인 오류 메시지를 덧붙여서 다시 발생)
+    """
+    with collect_messages() as messages:
+        try:
+            result = _run(
+                client, response_cache, query, shard_mode, stream, force_regenerate,
+                report or _ignore, on_context or _ignore, on_cases or _ignore
+            )
+        except Exception as e:
+            if messages:
+                raise RuntimeError(f"{e} (이전 오류: {'; '.join(messages)})") from e
+            raise
+    result['errors'] = messages
+    return result
+
+
+def _run(client, response_cache, query, shard_mode, stream, force_regenerate, report, on_context, on_cases):
+    """run_recommendation 본문 (화면 출력 없음)"""
+    # 1. 유사한 테스트 케이스 + 기획 문서 검색 (검색어 임베딩 1회)
+    report(0.05, "유사한 케이스 검색 중...")
+    relevant_cases, spec_docs = search_test_cases_and_spec_docs(
+        query=query,
+        case_limit=50,
+        doc_limit=10,
+        similarity_threshold=0.3  # 30% 이상 유사도
+    )
+    fallback = not relevant_cases
+    if fallback:
+        # 검색 결과가 없으면 최신 50개
+        relevant_cases = load_test_cases_from_supabase(limit=50)
+
+    # 2. 프롬프트 (토큰 예산 안에서 학습 데이터 구성)
+    prompt, prompt_stats = build_recommendation_prompt(query, relevant_cases, spec_docs)
+    on_context(relevant_cases, spec_docs, prompt_stats, fallback)
+
+    result = {
+        "query": query,
+        "ai_response": None,
+        "issues": [],
+        "response_text": "",
+        "relevant_cases": relevant_cases,
+        "spec_docs": spec_docs,
+        "prompt_stats": prompt_stats,
+        "from_cache": False
+    }
+
+    # 3. 결과 캐시 확인 (모델 + 템플릿 버전 + 검색어 + 검색된 케이스/문서 지문)
+    response_key = make_response_key(
+        client.model_name,
+        f"{PROMPT_TEMPLATE_VERSION}-{'shard' if shard_mode else 'single'}",
+        query,
+        relevant_cases,
+        spec_docs
+    )
+    cached_response = None if force_regenerate else response_cache.get(response_key)
+    if cached_response is not None:
+        result.update(ai_response=cached_response, from_cache=True)
+        return result
+
+    # 4. 생성
+    if shard_mode:
+        # 개요 → 섹션별 병렬 생성 (완료된 섹션부터 전달)
+        report(0.15, "개요 작성 중...")
+
+        def on_section_done(done, total, cases):
+            on_cases(cases)
+            report(0.15 + 0.85 * done / total, f"섹션 {done}/{total} 완료")
+
+        ai_response, issues = generate_sharded(client, prompt, on_section_done=on_section_done)
+    else:
+        report(0.15, "AI 생성 중...")
+        if stream:
+            # 케이스가 완성될 때마다 전달
+            case_parser = StreamingCaseParser()
+            generated = 0
+            expected = requested_case_count(query) or 20
+            response = client.generate_content(
+                prompt,
+                generation_config=STRUCTURED_GENERATION_CONFIG,
+                stream=True
+            )
+            for text in stream_text(response):
+                result['response_text'] += text
+                new_cases = case_parser.feed(text)
+                if new_cases:
+                    generated += len(new_cases)
+                    on_cases(new_cases)
+                    report(min(0.95, 0.15 + 0.8 * generated / expected), f"케이스 {generated}개 생성됨")
+        else:
+            response = client.generate_content(
+                prompt,
+                generation_config=STRUCTURED_GENERATION_CONFIG
+            )
+            result['response_text'] = response.text
+
+        # JSON 파싱 (스키마 검증, 깨진 항목만 복구)
+        ai_response, issues = parse_recommendation_response(result['response_text'])
+
+    result.update(ai_response=ai_response, issues=issues)
+    # 보정/복구한 응답은 캐시하지 않음 (다음 요청에서 깨끗한 결과처럼 재사용되지 않도록)
+    if ai_response is not None and not issues:
+        response_cache.set(response_key, query, ai_response)
+    return result
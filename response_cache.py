@@ -0,0 +1,117 @@
+# response_cache.py
+"""
+AI 추천 결과 캐시 (로컬 SQLite 파일)
+- 키: (모델, 프롬프트 템플릿 버전, 정규화된 검색어, 검색된 케이스/문서 지문)
+- 검색된 행의 id와 내용이 지문에 들어가므로, 행이 추가/수정/삭제되면 자동으로 다른 키가 됨
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+
+
+def normalize_query(query):
+    """공백 정리 + 소문자 변환"""
+    return " ".join(query.split()).lower()
+
+
+# 검색할 때마다 달라질 수 있는 점수 필드 (지문에서 제외)
+SCORE_FIELDS = ('similarity', 'lexical_score', 'rrf_score')
+
+
+def context_fingerprint(test_cases, spec_docs):
+    """검색된 테스트 케이스/기획 문서의 id + 내용 해시 (점수 제외)"""
+    cases = sorted(
+        json.dumps(
+            {k: v for k, v in tc.items() if k not in SCORE_FIELDS},
+            ensure_ascii=False,
+            sort_keys=True,
+            default=str
+        )
+        for tc in test_cases
+    )
+    docs = sorted(
+        json.dumps(
+            {k: doc.get(k) for k in ('id', 'title', 'doc_type', 'content')},
+            ensure_ascii=False,
+            sort_keys=True
+        )
+        for doc in spec_docs
+    )
+    return hashlib.sha256("\n".join(cases + ["--"] + docs).encode('utf-8')).hexdigest()
+
+
+def make_response_key(model_name, template_version, query, test_cases, spec_docs):
+    """캐시 키 생성"""
+    parts = [model_name, str(template_version), normalize_query(query), context_fingerprint(test_cases, spec_docs)]
+    return hashlib.sha256("\x1f".join(parts).encode('utf-8')).hexdigest()
+
+
+class ResponseCache:
+    """
+    AI 응답(JSON) 캐시 (저장할 때 오래된 항목 정리)
+
+    Args:
+        db_path (str): SQLite 파일 경로
+        max_items (int): 최대 항목 수 (초과 시 오래된 것부터 삭제)
+        ttl_seconds (int): 항목 유효 시간 (초)
+    """
+
+    def __init__(self, db_path, max_items=500, ttl_seconds=30 * 24 * 3600):
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.max_items = max_items
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(db_path, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "cache_key TEXT PRIMARY KEY, "
+            "query TEXT, "
+            "response TEXT NOT NULL, "
+            "created_at TEXT NOT NULL)"
+        )
+        self._db.commit()
+
+    def get(self, cache_key):
+        """캐시 조회 (없으면 None)"""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT response FROM responses WHERE cache_key = ? AND created_at >= ?", (cache_key, self._cutoff())
+            ).fetchone()
+            if row:
+                self.hits += 1
+                return json.loads(row[0])
+            self.misses += 1
+            return None
+
+    def set(self, cache_key, query, response):
+        """캐시 저장 (같은 키는 덮어씀) + 유효 시간이 지났거나 max_items를 넘는 오래된 항목 삭제"""
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses (cache_key, query, response, created_at) VALUES (?, ?, ?, ?)",
+                (cache_key, query, json.dumps(response, ensure_ascii=False), datetime.now().isoformat())
+            )
+            self._db.execute("DELETE FROM responses WHERE created_at < ?", (self._cutoff(),))
+            self._db.execute(
+                "DELETE FROM responses WHERE cache_key NOT IN "
+                "(SELECT cache_key FROM responses ORDER BY created_at DESC LIMIT ?)",
+                (self.max_items,)
+            )
+            self._db.commit()
+
+    def clear(self):
+        """전체 삭제"""
+        with self._lock:
+            self._db.execute("DELETE FROM responses")
+            self._db.commit()
+
+    def _cutoff(self):
+        """유효 시간 기준 시각 (created_at과 같은 ISO 문자열)"""
+        return (datetime.now() - timedelta(seconds=self.ttl_seconds)).isoformat()
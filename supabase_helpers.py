@@ -7,7 +7,66 @@ import streamlit as st
 from supabase import create_client
 import google.generativeai as genai
 import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from datetime import datetime
+from embedding_cache import EmbeddingCache, QueryEmbeddingCache
+from gemini_client import GeminiClient
+from ingest_queue import IngestQueue
+from table_rows import TABLE_COLUMNS
+from corpus_export import export_pages
+from vector_index import VectorIndex
+from lexical_index import BM25Index
+from local_replica import LocalReplica
+
+EMBEDDING_MODEL = "models/text-embedding-004"
+
+# 벡터 검색 방식: "rpc" (Supabase match_test_cases) 또는 "local" (로컬 인덱스)
+# - local은 인덱스를 다시 만들 때마다(10분) test_cases 전체를 임베딩 포함해서 Supabase에서 받아옴
+VECTOR_SEARCH_BACKEND = os.environ.get("VECTOR_SEARCH_BACKEND", "rpc")
+# 로컬 인덱스 종류: "flat" / "ivf" / "hnsw" (hnsw는 hnswlib 설치 필요, 없으면 검색 시 오류 표시)
+VECTOR_INDEX_MODE = os.environ.get("VECTOR_INDEX_MODE", "flat")
+
+# 목록/통계/키워드 검색을 로컬 복제본에서 조회 ("1") 또는 항상 Supabase에서 조회 ("0")
+LOCAL_REPLICA = os.environ.get("LOCAL_REPLICA", "1") == "1"
+
+# =============================================
+# 0. 오류/경고 메시지 (작업 스레드에서는 화면 대신 결과로 전달)
+# =============================================
+
+_collected = threading.local()
+
+@contextmanager
+def collect_messages():
+    """
+    with 블록 안(같은 스레드)의 오류/경고 메시지를 화면에 출력하지 않고 리스트로 모음
+    (백그라운드 작업 스레드에는 화면이 없어서 st.error/st.warning이 그냥 사라짐)
+    
+    Yields:
+        list: 메시지 문자열 리스트
+    """
+    previous = getattr(_collected, 'messages', None)
+    _collected.messages = []
+    try:
+        yield _collected.messages
+    finally:
+        _collected.messages = previous
+
+def show_error(message):
+    """오류 메시지 (collect_messages 안이면 모으기만 함)"""
+    if getattr(_collected, 'messages', None) is not None:
+        _collected.messages.append(message)
+    else:
+        st.error(message)
+
+def show_warning(message):
+    """경고 메시지 (collect_messages 안이면 모으기만 함)"""
+    if getattr(_collected, 'messages', None) is not None:
+        _collected.messages.append(message)
+    else:
+        st.warning(message)
 
 # =============================================
 # 1. 초기화 함수
@@ -21,17 +80,81 @@ def get_supabase_client():
         key = st.secrets["SUPABASE_KEY"]
         return create_client(url, key)
     except Exception as e:
-        st.error(f"Supabase 연결 실패: {str(e)}")
+        show_error(f"Supabase 연결 실패: {str(e)}")
         return None
 
-def get_gemini_embedding_client():
-    """Gemini 임베딩용 클라이언트"""
+def get_gemini_api():
+    """
+    공용 Gemini 클라이언트 (임베딩/생성 모두 이 클라이언트를 거침)
+    
+    Returns:
+        GeminiClient: 속도 제한 + 재시도 적용 클라이언트 (API 키가 없으면 None)
+    """
     api_key = os.environ.get("GOOGLE_API_KEY") or st.secrets.get("GOOGLE_API_KEY")
     if not api_key:
-        st.error("GOOGLE_API_KEY 환경 변수가 설정되지 않았습니다.")
+        show_error("GOOGLE_API_KEY 환경 변수가 설정되지 않았습니다.")
         return None
+    return create_gemini_api(api_key)
+
+@st.cache_resource
+def create_gemini_api(api_key):
+    """API 키별 공용 클라이언트 (모든 세션/스레드가 같은 속도 제한을 공유)"""
     genai.configure(api_key=api_key)
-    return True
+    return GeminiClient.from_env()
+
+@st.cache_resource
+def get_embedding_cache():
+    """임베딩 캐시 (메모리 LRU + 로컬 SQLite)"""
+    db_path = os.environ.get("EMBEDDING_CACHE_PATH", ".cache/embeddings.sqlite3")
+    try:
+        return EmbeddingCache(db_path=db_path)
+    except Exception as e:
+        show_warning(f"임베딩 캐시 파일 사용 불가, 메모리 캐시만 사용합니다: {str(e)}")
+        return EmbeddingCache()
+
+# 조회 용도별 컬럼 (embedding은 'search' 조회에서만 가져옴)
+PROJECTIONS = {
+    'test_cases': {
+        'stats': 'id, category',
+        'list': 'id, category, name, data, created_at',
+        'detail': 'id, category, name, link, description, data, created_at',
+        'export': 'id, category, name, link, description, data, created_at',
+        'search': 'id, category, name, link, description, data, created_at, embedding',
+    },
+    'spec_docs': {
+        'stats': 'id, doc_type',
+        'list': 'id, title, doc_type',
+        'detail': 'id, title, doc_type, link, content',
+        'export': 'id, title, doc_type, link, content',
+        'search': 'id, title, doc_type, link, content, embedding',
+    },
+}
+
+def select_projection(table_name, projection='detail', count=None):
+    """
+    용도별 컬럼만 조회하는 select 쿼리 생성 (모든 조회는 이 함수를 거침)
+    
+    Args:
+        table_name (str): 'test_cases' 또는 'spec_docs'
+        projection (str): 'stats', 'list', 'detail', 'export', 'search'
+        count (str): 서버 측 count 방식 ("exact", "estimated" 등)
+    
+    Returns:
+        쿼리 빌더 (Supabase 연결 실패 시 None)
+    """
+    supabase = get_supabase_client()
+    if not supabase:
+        return None
+    
+    columns = PROJECTIONS[table_name][projection]
+    if count:
+        return supabase.table(table_name).select(columns, count=count)
+    return supabase.table(table_name).select(columns)
+
+@st.cache_resource
+def get_query_embedding_cache():
+    """검색어 임베딩 캐시 (모든 세션 공유, 1시간 유지)"""
+    return QueryEmbeddingCache(max_items=1000, ttl_seconds=3600)
 
 # =============================================
 # 2. 임베딩 생성 함수
@@ -48,31 +171,219 @@ def generate_embedding(text):
         list: 768차원 벡터 또는 None
     """
     try:
-        if not get_gemini_embedding_client():
+        cache = get_embedding_cache()
+        cached = cache.get(EMBEDDING_MODEL, "retrieval_document", text)
+        if cached:
+            return cached
+        
+        api = get_gemini_api()
+        if not api:
             return None
         
-        result = genai.embed_content(
-            model="models/text-embedding-004",
+        result = api.embed_content(
+            model=EMBEDDING_MODEL,
             content=text,
             task_type="retrieval_document"
         )
+        cache.set(EMBEDDING_MODEL, "retrieval_document", text, result['embedding'])
         return result['embedding']
     
     except Exception as e:
-        st.error(f"임베딩 생성 실패: {str(e)}")
+        show_error(f"임베딩 생성 실패: {str(e)}")
         return None
 
+def generate_embeddings(texts, batch_size=100):
+    """
+    여러 텍스트를 배치 요청으로 한 번에 768차원 벡터로 변환
+    (행마다 API를 호출하지 않고 batch_size개씩 묶어서 호출)
+    
+    Args:
+        texts (list): 임베딩할 텍스트 리스트
+        batch_size (int): 요청당 텍스트 수 (Gemini 배치 최대 100개)
+    
+    Returns:
+        list: 입력 순서와 동일한 벡터 리스트 (실패한 항목은 None)
+    """
+    embeddings = [None] * len(texts)
+    
+    # 캐시에 있는 텍스트는 API 호출 생략
+    cache = get_embedding_cache()
+    missing = []
+    for i, text in enumerate(texts):
+        embeddings[i] = cache.get(EMBEDDING_MODEL, "retrieval_document", text)
+        if embeddings[i] is None:
+            missing.append(i)
+    
+    api = get_gemini_api() if missing else None
+    if not api:
+        return embeddings
+    
+    for start in range(0, len(missing), batch_size):
+        batch_idx = missing[start:start + batch_size]
+        batch = [texts[i] for i in batch_idx]
+        
+        try:
+            result = api.embed_content(
+                model=EMBEDDING_MODEL,
+                content=batch,
+                task_type="retrieval_document"
+            )
+            for i, embedding in zip(batch_idx, result['embedding']):
+                embeddings[i] = embedding
+                cache.set(EMBEDDING_MODEL, "retrieval_document", texts[i], embedding)
+        
+        except Exception as e:
+            # 배치 실패 시 해당 배치만 개별 호출로 재시도 (캐시는 위에서 이미 확인함 → API 직접 호출)
+            show_warning(f"배치 임베딩 실패, 개별 생성으로 전환: {str(e)}")
+            for i in batch_idx:
+                try:
+                    result = api.embed_content(
+                        model=EMBEDDING_MODEL,
+                        content=texts[i],
+                        task_type="retrieval_document"
+                    )
+                    embeddings[i] = result['embedding']
+                    cache.set(EMBEDDING_MODEL, "retrieval_document", texts[i], embeddings[i])
+                except Exception as item_error:
+                    show_error(f"임베딩 생성 실패: {str(item_error)}")
+    
+    return embeddings
+
+def embed_query(query):
+    """
+    검색어를 검색용(retrieval_query) 벡터로 변환
+    (실패 시 예외 발생 → 호출하는 검색 함수에서 처리)
+    """
+    # 같은 검색어(공백/대소문자 무시)는 캐시 사용
+    cache = get_query_embedding_cache()
+    cached = cache.get(EMBEDDING_MODEL, query)
+    if cached:
+        return cached
+    
+    api = get_gemini_api()
+    if not api:
+        raise RuntimeError("GOOGLE_API_KEY 환경 변수가 설정되지 않았습니다.")
+    
+    query_embedding = api.embed_content(
+        model=EMBEDDING_MODEL,
+        # model="models/text-embedding-3-small",  # 전문가 찾기 임베딩 모델 (1536차원)
+        content=query,
+        task_type="retrieval_query"  # 검색용!
+    )['embedding']
+    cache.set(EMBEDDING_MODEL, query, query_embedding)
+    return query_embedding
+
+def build_row_search_text(row):
+    """표 형식 행(row)의 검색용 텍스트 생성"""
+    return (
+        f"{row.get('CATEGORY', '')} "
+        f"{row.get('DEPTH 1', '')} "
+        f"{row.get('DEPTH 2', '')} "
+        f"{row.get('DEPTH 3', '')} "
+        f"{row.get('PRE-CONDITION', '')} "
+        f"{row.get('STEP', '')} "
+        f"{row.get('EXPECT RESULT', '')}"
+    )
+
 # =============================================
 # 3. 테스트 케이스 저장 함수 (개별 저장 방식)
 # =============================================
 
-def save_test_case_to_supabase(test_case):
+def data_to_table_row(data):
+    """test_cases.data(JSONB)를 표 형식 행(row)으로 변환"""
+    return {
+        'NO': data.get('no', ''),
+        'CATEGORY': data.get('category', ''),
+        'DEPTH 1': data.get('depth1', ''),
+        'DEPTH 2': data.get('depth2', ''),
+        'DEPTH 3': data.get('depth3', ''),
+        'PRE-CONDITION': data.get('pre_condition', ''),
+        'STEP': data.get('step', ''),
+        'EXPECT RESULT': data.get('expect_result', '')
+    }
+
+# 전체 내보내기(Excel 등) 열 순서
+TEST_CASE_EXPORT_COLUMNS = ['ID', 'GROUP ID', 'INPUT TYPE'] + TABLE_COLUMNS + ['NAME', 'LINK', 'DESCRIPTION', 'CREATED AT']
+
+def test_case_export_row(row):
+    """test_cases 행('export' 조회)을 내보내기용 평면 행으로 변환"""
+    data = row.get('data') or {}
+    export_row = data_to_table_row(data)
+    if not export_row['CATEGORY']:
+        export_row['CATEGORY'] = row.get('category', '')
+    export_row.update({
+        'ID': row.get('id'),
+        'GROUP ID': data.get('group_id', ''),
+        'INPUT TYPE': data.get('input_type', ''),
+        'NAME': row.get('name', ''),
+        'LINK': row.get('link', ''),
+        'DESCRIPTION': row.get('description', ''),
+        'CREATED AT': row.get('created_at', '')
+    })
+    return export_row
+
+def build_table_row_record(row, idx, group_id, test_case, embedding):
+    """표 형식 행(row)을 test_cases 테이블 레코드로 변환"""
+    return {
+        "category": row.get('CATEGORY', ''),
+        "name": f"{row.get('DEPTH 1', '')} {row.get('DEPTH 2', '')}".strip(),
+        "link": test_case.get('link', ''),
+        "description": f"[STEP] {row.get('STEP', '')} [EXPECT] {row.get('EXPECT RESULT', '')}",
+        "data": {
+            "group_id": group_id,
+            "input_type": test_case.get('input_type', 'table_group'),
+            "no": row.get('NO') or idx,
+            "category": row.get('CATEGORY', ''),
+            "depth1": row.get('DEPTH 1', ''),
+            "depth2": row.get('DEPTH 2', ''),
+            "depth3": row.get('DEPTH 3', ''),
+            "pre_condition": row.get('PRE-CONDITION', ''),
+            "step": row.get('STEP', ''),
+            "expect_result": row.get('EXPECT RESULT', '')
+        },
+        "embedding": str(embedding)
+    }
+
+def insert_rows_in_chunks(table_name, records, chunk_size=500):
+    """
+    여러 행을 chunk_size개씩 묶어서 multi-row insert
+    (행마다 insert().execute() 하지 않음)
+    
+    Args:
+        table_name (str): 테이블 이름
+        records (list): 저장할 레코드 리스트
+        chunk_size (int): 요청당 행 수
+    
+    Returns:
+        list: 묶음별 결과 [{"chunk", "rows", "success", "error"}]
+    """
+    report = []
+    
+    supabase = get_supabase_client()
+    if not supabase:
+        return report
+    
+    for chunk_no, start in enumerate(range(0, len(records), chunk_size), 1):
+        chunk = records[start:start + chunk_size]
+        
+        try:
+            result = supabase.table(table_name).insert(chunk).execute()
+            report.append({"chunk": chunk_no, "rows": len(chunk), "success": True, "error": None})
+        except Exception as e:
+            report.append({"chunk": chunk_no, "rows": len(chunk), "success": False, "error": str(e)})
+            continue
+        
+        notify_replica(table_name, inserted=result.data)
+    return report
+
+def save_test_case_to_supabase(test_case, chunk_size=500):
     """
     단일 테스트 케이스를 Supabase에 저장
     (그룹은 자동으로 개별 케이스로 쪼갬!)
     
     Args:
         test_case (dict): 테스트 케이스 데이터
+        chunk_size (int): 표 그룹 저장 시 insert 요청당 행 수
     
     Returns:
         int: 저장된 케이스 수
@@ -90,46 +401,30 @@ def save_test_case_to_supabase(test_case):
         if test_case.get('table_data'):
             group_id = test_case.get('group_id', f"group_{datetime.now().strftime('%Y%m%d_%H%M%S')}")
             
-            for idx, row in enumerate(test_case.get('table_data', []), 1):
-                # 1. 검색용 텍스트 생성
-                search_text = (
-                    f"{row.get('CATEGORY', '')} "
-                    f"{row.get('DEPTH 1', '')} "
-                    f"{row.get('DEPTH 2', '')} "
-                    f"{row.get('DEPTH 3', '')} "
-                    f"{row.get('PRE-CONDITION', '')} "
-                    f"{row.get('STEP', '')} "
-                    f"{row.get('EXPECT RESULT', '')}"
-                )
-                
-                # 2. 임베딩 생성
-                embedding = generate_embedding(search_text)
+            table_data = test_case.get('table_data', [])
+            
+            # 1. 검색용 텍스트 생성
+            search_texts = [build_row_search_text(row) for row in table_data]
+            
+            # 2. 임베딩 생성 (배치 호출)
+            embeddings = generate_embeddings(search_texts)
+            
+            # 3. 개별 케이스 레코드 수집
+            records = []
+            for idx, (row, embedding) in enumerate(zip(table_data, embeddings), 1):
                 if not embedding:
-                    st.warning(f"임베딩 생성 실패: {row.get('DEPTH 1', 'unknown')}")
+                    show_warning(f"임베딩 생성 실패: {row.get('DEPTH 1', 'unknown')}")
                     continue
                 
-                # 3. 개별 케이스로 저장
-                result = supabase.table('test_cases').insert({
-                    "category": row.get('CATEGORY', ''),
-                    "name": f"{row.get('DEPTH 1', '')} {row.get('DEPTH 2', '')}".strip(),
-                    "link": test_case.get('link', ''),
-                    "description": f"[STEP] {row.get('STEP', '')} [EXPECT] {row.get('EXPECT RESULT', '')}",
-                    "data": {
-                        "group_id": group_id,
-                        "input_type": test_case.get('input_type', 'table_group'),
-                        "no": row.get('NO', idx),
-                        "category": row.get('CATEGORY', ''),
-                        "depth1": row.get('DEPTH 1', ''),
-                        "depth2": row.get('DEPTH 2', ''),
-                        "depth3": row.get('DEPTH 3', ''),
-                        "pre_condition": row.get('PRE-CONDITION', ''),
-                        "step": row.get('STEP', ''),
-                        "expect_result": row.get('EXPECT RESULT', '')
-                    },
-                    "embedding": str(embedding)
-                }).execute()
-                
-                saved_count += 1
+                records.append(build_table_row_record(row, idx, group_id, test_case, embedding))
+            
+            # 4. 청크 단위 일괄 저장
+            report = insert_rows_in_chunks('test_cases', records, chunk_size=chunk_size)
+            for chunk in report:
+                if not chunk['success']:
+                    show_warning(f"{chunk['chunk']}번째 묶음({chunk['rows']}개) 저장 실패: {chunk['error']}")
+            
+            saved_count = sum(chunk['rows'] for chunk in report if chunk['success'])
             
             return saved_count
         
@@ -147,7 +442,7 @@ def save_test_case_to_supabase(test_case):
             # 2. 임베딩 생성
             embedding = generate_embedding(search_text)
             if not embedding:
-                st.warning(f"임베딩 생성 실패: {test_case.get('name')}")
+                show_warning(f"임베딩 생성 실패: {test_case.get('name')}")
                 return 0
             
             # 3. 저장
@@ -160,12 +455,140 @@ def save_test_case_to_supabase(test_case):
                 "embedding": str(embedding)
             }).execute()
             
+            notify_replica('test_cases', inserted=result.data)
             return 1
     
     except Exception as e:
-        st.error(f"Supabase 저장 실패: {str(e)}")
+        show_error(f"Supabase 저장 실패: {str(e)}")
         return 0
 
+def save_table_group_changes(group_id, input_type, original_rows, edited_rows):
+    """
+    표 그룹 수정사항만 반영 (전체 삭제 후 재저장하지 않음)
+    - 변경 없는 행: 그대로 둠
+    - 수정된 행: update (검색용 텍스트가 바뀐 경우만 재임베딩)
+    - 추가된 행: insert
+    - 삭제/비워진 행: 한 번에 일괄 삭제
+    
+    Args:
+        group_id (str): 그룹 ID
+        input_type (str): 그룹 입력 타입
+        original_rows (list): Supabase 원본 행 (id, link, data 포함, 표 순서대로)
+        edited_rows (list): 수정된 표 행 (같은 위치 = 같은 행, 비워진 행은 None)
+    
+    Returns:
+        dict: {"inserted", "updated", "deleted", "unchanged", "embedded"} 개수
+    """
+    summary = {"inserted": 0, "updated": 0, "deleted": 0, "unchanged": 0, "embedded": 0}
+    
+    supabase = get_supabase_client()
+    if not supabase:
+        return summary
+    
+    # 1. 위치별로 원본 행과 수정된 행 비교
+    to_update = []  # (원본 행, 수정된 행, 위치)
+    to_insert = []  # (수정된 행, 위치)
+    to_delete = []  # 삭제할 id
+    
+    for idx in range(max(len(original_rows), len(edited_rows))):
+        original = original_rows[idx] if idx < len(original_rows) else None
+        edited = edited_rows[idx] if idx < len(edited_rows) else None
+        
+        if original and not edited:
+            to_delete.append(original['id'])
+        elif edited and not original:
+            to_insert.append((edited, idx + 1))
+        elif original and edited:
+            original_row = data_to_table_row(original.get('data') or {})
+            if all(str(original_row[col]) == str(edited.get(col, '')) for col in TABLE_COLUMNS):
+                summary["unchanged"] += 1
+            else:
+                to_update.append((original, edited, idx + 1))
+    
+    # 2. 검색용 텍스트가 바뀐 행만 임베딩 (배치 호출)
+    embed_targets = [
+        (original, edited, idx) for original, edited, idx in to_update
+        if build_row_search_text(data_to_table_row(original.get('data') or {})) != build_row_search_text(edited)
+    ] + [(None, edited, idx) for edited, idx in to_insert]
+    
+    embeddings = generate_embeddings([build_row_search_text(edited) for _, edited, _ in embed_targets])
+    new_embeddings = {id(edited): embedding for (_, edited, _), embedding in zip(embed_targets, embeddings)}
+    summary["embedded"] = sum(1 for embedding in embeddings if embedding)
+    
+    # 3. 수정된 행 update
+    for original, edited, idx in to_update:
+        embedding = new_embeddings.get(id(edited))
+        if id(edited) in new_embeddings and not embedding:
+            show_warning(f"임베딩 생성 실패: {edited.get('DEPTH 1', 'unknown')}")
+            continue
+        
+        test_case = {"input_type": input_type, "link": original.get('link', '')}
+        record = build_table_row_record(edited, idx, group_id, test_case, embedding)
+        if embedding is None:
+            del record['embedding']  # 검색용 텍스트 동일 → 기존 임베딩 유지
+        
+        supabase.table('test_cases').update(record).eq('id', original['id']).execute()
+        notify_replica('test_cases', updates={original['id']: record})
+        summary["updated"] += 1
+    
+    # 4. 추가된 행 insert
+    records = []
+    for edited, idx in to_insert:
+        if not new_embeddings.get(id(edited)):
+            show_warning(f"임베딩 생성 실패: {edited.get('DEPTH 1', 'unknown')}")
+            continue
+        records.append(build_table_row_record(edited, idx, group_id, {"input_type": input_type}, new_embeddings[id(edited)]))
+    
+    report = insert_rows_in_chunks('test_cases', records)
+    summary["inserted"] = sum(chunk['rows'] for chunk in report if chunk['success'])
+    
+    # 5. 삭제된 행 일괄 삭제
+    if to_delete and delete_test_cases_from_supabase(to_delete):
+        summary["deleted"] = len(to_delete)
+    
+    return summary
+
+def ingest_table_rows(group_id, rows, start_idx):
+    """
+    대량 저장 큐의 묶음 1개 처리 (임베딩 배치 생성 + 일괄 insert)
+    - 임베딩이 하나라도 실패하면 아무것도 저장하지 않고 예외 발생 → 묶음째 재시도
+    
+    Args:
+        group_id (str): 그룹 ID
+        rows (list): 표 형식 행 리스트
+        start_idx (int): 첫 행의 번호 (NO가 비어 있을 때 사용)
+    
+    Returns:
+        int: 저장된 케이스 수
+    """
+    if not rows:
+        return 0
+    
+    embeddings = generate_embeddings([build_row_search_text(row) for row in rows])
+    failed = sum(1 for embedding in embeddings if not embedding)
+    if failed:
+        raise RuntimeError(f"임베딩 생성 실패 {failed}건")
+    
+    records = [
+        build_table_row_record(row, start_idx + offset, group_id, {"input_type": "table_group"}, embedding)
+        for offset, (row, embedding) in enumerate(zip(rows, embeddings))
+    ]
+    
+    # 묶음 크기(≤ 500) 안에서는 insert 1회
+    report = insert_rows_in_chunks('test_cases', records, chunk_size=max(len(records), 1))
+    errors = [chunk['error'] for chunk in report if not chunk['success']]
+    if errors or not report:
+        raise RuntimeError(f"저장 실패: {errors[0] if errors else 'Supabase 연결 실패'}")
+    
+    return len(records)
+
+@st.cache_resource
+def get_ingest_queue():
+    """대량 저장 큐 (로컬 SQLite, 백그라운드 워커 1개, 앱 재시작 시 남은 묶음부터 이어서 처리)"""
+    queue = IngestQueue(os.environ.get("INGEST_QUEUE_PATH", ".cache/ingest.sqlite3"))
+    queue.start(ingest_table_rows)
+    return queue
+
 # =============================================
 # 4. 테스트 케이스 불러오기 (그룹 재구성 옵션)
 # =============================================
@@ -181,12 +604,12 @@ def load_test_cases_from_supabase(limit=None, group_by_id=False):
         list: 테스트 케이스 리스트
     """
     try:
-        supabase = get_supabase_client()
-        if not supabase:
+        query = select_projection('test_cases', 'detail')
+        if query is None:
             return []
         
         # 전체 조회
-        query = supabase.table('test_cases').select('id, category, name, link, description, data, created_at').order('id', desc=True)
+        query = query.order('id', desc=True)
         
         if limit:
             query = query.limit(limit)
@@ -252,14 +675,92 @@ def load_test_cases_from_supabase(limit=None, group_by_id=False):
             return test_cases
     
     except Exception as e:
-        st.error(f"테스트 케이스 불러오기 실패: {str(e)}")
+        show_error(f"테스트 케이스 불러오기 실패: {str(e)}")
         return []
 
+def load_test_cases_page(page_size=50, before_id=None):
+    """
+    테스트 케이스 페이지 조회 (id 기준 keyset 페이지네이션, 최신순)
+    - 페이지에는 최대 page_size행만 담음 (대량 업로드 그룹의 나머지 행을 같이 가져오지 않음)
+    - 그룹은 전체 행 수만 함께 알려줌 → 일부만 담긴 그룹은 load_group_rows로 따로 조회
+    
+    Args:
+        page_size (int): 페이지당 행 수
+        before_id (int): 이 id보다 작은 행부터 조회 (None이면 첫 페이지)
+    
+    Returns:
+        tuple: (행 리스트, 다음 페이지 커서 id 또는 None, {그룹 ID: 그룹 전체 행 수})
+    """
+    try:
+        replica = get_ready_replica('test_cases')
+        if replica:
+            rows = replica.test_cases_before(before_id, page_size)
+        else:
+            query = select_projection('test_cases', 'detail')
+            if query is None:
+                return [], None
+            
+            query = query.order('id', desc=True).limit(page_size)
+            if before_id is not None:
+                query = query.lt('id', before_id)
+            rows = query.execute().data
+        
+        next_cursor = rows[-1]['id'] if len(rows) == page_size else None
+        
+        group_ids = {(row.get('data') or {}).get('group_id') for row in rows} - {None}
+        return rows, next_cursor, count_group_rows(group_ids)
+    
+    except Exception as e:
+        show_error(f"테스트 케이스 페이지 조회 실패: {str(e)}")
+        return [], None, {}
+
+def count_group_rows(group_ids):
+    """
+    그룹별 전체 행 수 (서버 측 count, 행은 전송하지 않음)
+    
+    data->>group_id 조회가 느리면 Supabase SQL Editor에서 인덱스 생성:
+        create index if not exists test_cases_group_id_idx on test_cases ((data->>'group_id'));
+    
+    Returns:
+        dict: {그룹 ID: 행 수}
+    """
+    if not group_ids:
+        return {}
+    
+    replica = get_ready_replica('test_cases')
+    if replica:
+        return replica.group_counts(group_ids)
+    
+    counts = {}
+    for group_id in group_ids:
+        query = select_projection('test_cases', 'stats', count='exact')
+        if query is None:
+            return counts
+        counts[group_id] = query.eq('data->>group_id', group_id).limit(1).execute().count
+    return counts
+
+def load_group_rows(group_id, page_size=1000):
+    """
+    표 그룹 전체 행 (id 오름차순, page_size행씩 나눠 조회 → PostgREST 1000행 제한에 잘리지 않음)
+    
+    Returns:
+        list: 그룹 행 리스트
+    """
+    replica = get_ready_replica('test_cases')
+    if replica:
+        return replica.test_cases_in_groups([group_id])
+    
+    return [
+        row
+        for page in iter_table_pages('test_cases', 'detail', page_size, filters={'data->>group_id': group_id})
+        for row in page
+    ]
+
 # =============================================
 # 5. 벡터 유사도 검색
 # =============================================
 
-def search_similar_test_cases(query, limit=50, similarity_threshold=0.3):
+def search_similar_test_cases(query, limit=50, similarity_threshold=0.3, query_embedding=None):
     """
     벡터 유사도 기반 검색
     
@@ -267,6 +768,7 @@ def search_similar_test_cases(query, limit=50, similarity_threshold=0.3):
         query (str): 검색어
         limit (int): 반환할 최대 결과 수. 100 이상은 검토 필요(Gemini API 호출 시간, API 비용 증가. 노이즈 많음)
         similarity_threshold (float): 최소 유사도 (0~1)
+        query_embedding (list): 이미 만든 검색어 벡터 (None이면 새로 임베딩)
     
     Returns:
         list: 유사한 테스트 케이스 리스트 (유사도 포함)
@@ -277,33 +779,19 @@ def search_similar_test_cases(query, limit=50, similarity_threshold=0.3):
             return []
         
         # 1. 검색어 임베딩
-        query_embedding = genai.embed_content(
-            model="models/text-embedding-004",
-            # model="models/text-embedding-3-small",  # 전문가 찾기 임베딩 모델 (1536차원)
-            content=query,
-            task_type="retrieval_query"  # 검색용!
-        )['embedding']
-        
-        # 2. RPC 함수 호출 (벡터 검색)
-        result = supabase.rpc(
-            'match_test_cases',
-            {
-                'query_embedding': query_embedding,
-                'match_count': limit,
-                'similarity_threshold': similarity_threshold
-            }
-        ).execute()
+        if query_embedding is None:
+            query_embedding = embed_query(query)
+        
+        # 2. 벡터 검색 (VECTOR_SEARCH_BACKEND=local이면 로컬 인덱스, 기본은 RPC)
+        if VECTOR_SEARCH_BACKEND == "local":
+            rows = match_test_cases_local(query_embedding, limit, similarity_threshold)
+        else:
+            rows = match_test_cases_rpc(query_embedding, limit, similarity_threshold)
         
         # 3. 결과 파싱
         test_cases = []
-        for row in result.data:
-            # tc = row['data']  # JSONB 데이터
-            tc = row['data'].copy() if row.get('data') else {}  # JSONB 데이터 복사
-            tc['id'] = row['id']
-            tc['category'] = row.get('category', '')
-            tc['name'] = row.get('name', '')
-            tc['link'] = row.get('link', '')
-            tc['description'] = row.get('description', '')
+        for row in rows:
+            tc = row_to_test_case(row)
             tc['similarity'] = row['similarity']  # 유사도 추가!
             # tc['similarity'] = row.get('similarity', 0)
             
@@ -312,9 +800,192 @@ def search_similar_test_cases(query, limit=50, similarity_threshold=0.3):
         return test_cases
     
     except Exception as e:
-        st.error(f"벡터 검색 실패: {str(e)}")
+        show_error(f"벡터 검색 실패: {str(e)}")
         return []
 
+def row_to_test_case(row):
+    """test_cases 행을 검색 결과 형태(data + 기본 컬럼)로 변환"""
+    # tc = row['data']  # JSONB 데이터
+    tc = row['data'].copy() if row.get('data') else {}  # JSONB 데이터 복사
+    tc['id'] = row['id']
+    tc['category'] = row.get('category', '')
+    tc['name'] = row.get('name', '')
+    tc['link'] = row.get('link', '')
+    tc['description'] = row.get('description', '')
+    return tc
+
+def match_test_cases_rpc(query_embedding, limit=50, similarity_threshold=0.3):
+    """match_test_cases RPC 벡터 검색 (similarity 포함 행 반환)"""
+    supabase = get_supabase_client()
+    if not supabase:
+        return []
+    
+    result = supabase.rpc(
+        'match_test_cases',
+        {
+            'query_embedding': query_embedding,
+            'match_count': limit,
+            'similarity_threshold': similarity_threshold
+        }
+    ).execute()
+    return result.data
+
+def iter_table_pages(table_name, projection='export', page_size=1000, after_id=None, filters=None):
+    """
+    테이블 전체를 id 순서로 페이지 단위 조회 (keyset 페이지네이션, 한 페이지씩 반환)
+    
+    Args:
+        table_name (str): 'test_cases' 또는 'spec_docs'
+        projection (str): 조회 컬럼
+        page_size (int): 요청당 행 수
+        after_id (int): 이 id보다 큰 행부터 조회 (None이면 처음부터)
+        filters (dict): {컬럼: 값} 일치 조건 (예: {'data->>group_id': 그룹 ID})
+    
+    Yields:
+        list: 페이지 행 리스트
+    """
+    last_id = after_id
+    
+    while True:
+        query = select_projection(table_name, projection)
+        if query is None:
+            return
+        
+        query = query.order('id').limit(page_size)
+        for column, value in (filters or {}).items():
+            query = query.eq(column, value)
+        if last_id is not None:
+            query = query.gt('id', last_id)
+        page = query.execute().data
+        
+        if page:
+            yield page
+        if len(page) < page_size:
+            return
+        last_id = page[-1]['id']
+
+def fetch_test_case_snapshot(projection='search', page_size=1000):
+    """
+    test_cases 전체를 id 순서로 페이지 단위 조회 (로컬 인덱스용)
+    
+    Args:
+        projection (str): 조회 컬럼 ('search'는 embedding 포함)
+        page_size (int): 요청당 행 수
+    
+    Returns:
+        list: test_cases 행 리스트
+    """
+    return [row for page in iter_table_pages('test_cases', projection, page_size) for row in page]
+
+@st.cache_resource(ttl=600, show_spinner="로컬 벡터 인덱스 생성 중...")
+def get_local_vector_index():
+    """로컬 벡터 인덱스 (VECTOR_INDEX_MODE: flat / ivf / hnsw, 10분마다 재동기화)"""
+    return VectorIndex(mode=VECTOR_INDEX_MODE).build(fetch_test_case_snapshot())
+
+def match_test_cases_local(query_embedding, limit=50, similarity_threshold=0.3):
+    """로컬 벡터 인덱스 검색 (match_test_cases RPC와 같은 행 형태)"""
+    index = get_local_vector_index()
+    return [
+        {**row, 'similarity': similarity}
+        for row, similarity in index.search(query_embedding, limit, similarity_threshold)
+    ]
+
+def compare_vector_search(query, limit=50, similarity_threshold=0.3):
+    """
+    로컬 인덱스와 RPC 검색 결과 비교 (재현율, 응답 시간)
+    
+    Returns:
+        dict: {"recall", "rpc_ms", "local_ms", "rpc_count", "local_count"}
+    """
+    query_embedding = embed_query(query)
+    
+    get_local_vector_index()  # 인덱스 생성 시간은 측정에서 제외
+    
+    start = time.perf_counter()
+    rpc_rows = match_test_cases_rpc(query_embedding, limit, similarity_threshold)
+    rpc_ms = (time.perf_counter() - start) * 1000
+    
+    start = time.perf_counter()
+    local_rows = match_test_cases_local(query_embedding, limit, similarity_threshold)
+    local_ms = (time.perf_counter() - start) * 1000
+    
+    rpc_ids = {row['id'] for row in rpc_rows}
+    local_ids = {row['id'] for row in local_rows}
+    
+    return {
+        "recall": len(rpc_ids & local_ids) / len(rpc_ids) if rpc_ids else 1.0,
+        "rpc_ms": rpc_ms,
+        "local_ms": local_ms,
+        "rpc_count": len(rpc_rows),
+        "local_count": len(local_rows)
+    }
+
+@st.cache_resource(ttl=600, show_spinner="키워드 인덱스 생성 중...")
+def get_lexical_index():
+    """BM25 키워드 인덱스 (10분마다 재동기화)"""
+    return BM25Index().build(fetch_test_case_snapshot(projection='detail'))
+
+def search_lexical_test_cases(query, limit=50):
+    """
+    BM25 키워드 검색 (복제본이 준비됐으면 복제본 FTS5 인덱스 사용)
+    
+    Returns:
+        list: 테스트 케이스 리스트 (lexical_score 포함)
+    """
+    replica = get_ready_replica('test_cases')
+    results = replica.search_test_cases(query, limit) if replica else get_lexical_index().search(query, limit)
+    
+    test_cases = []
+    for row, score in results:
+        tc = row_to_test_case(row)
+        tc['lexical_score'] = score
+        test_cases.append(tc)
+    return test_cases
+
+def reciprocal_rank_fusion(rankings, k=60):
+    """
+    여러 검색 결과 순위를 RRF로 합침 (id 기준)
+    
+    Args:
+        rankings (list): 검색 결과 리스트들 (각각 순위순)
+        k (int): RRF 상수 (클수록 하위 순위 영향 증가)
+    
+    Returns:
+        list: 합쳐진 결과 (rrf_score 내림차순)
+    """
+    fused = {}
+    for ranking in rankings:
+        for rank, tc in enumerate(ranking, 1):
+            merged = fused.setdefault(tc['id'], {'rrf_score': 0.0})
+            for key, value in tc.items():
+                merged.setdefault(key, value)
+            merged['rrf_score'] += 1 / (k + rank)
+    
+    return sorted(fused.values(), key=lambda x: x['rrf_score'], reverse=True)
+
+def hybrid_search_test_cases(query, limit=50, similarity_threshold=0.3, query_embedding=None):
+    """
+    키워드(BM25) + 벡터 검색 결과를 RRF로 합친 하이브리드 검색
+    (한쪽 검색이 실패해도 다른 쪽 결과로 진행)
+    
+    Returns:
+        list: 테스트 케이스 리스트 (similarity / lexical_score / rrf_score 포함)
+    """
+    vector_cases = search_similar_test_cases(
+        query,
+        limit=limit,
+        similarity_threshold=similarity_threshold,
+        query_embedding=query_embedding
+    )
+    
+    try:
+        lexical_cases = search_lexical_test_cases(query, limit=limit)
+    except Exception as e:
+        show_warning(f"키워드 검색 실패: {str(e)}")
+        lexical_cases = []
+    
+    return reciprocal_rank_fusion([vector_cases, lexical_cases])[:limit]
+
 # =============================================
 # 6. 테스트 케이스 삭제
 # =============================================
@@ -335,10 +1006,37 @@ def delete_test_case_from_supabase(test_case_id):
             return False
         
         supabase.table('test_cases').delete().eq('id', test_case_id).execute()
+        notify_replica('test_cases', deleted_ids=[test_case_id])
         return True
     
     except Exception as e:
-        st.error(f"삭제 실패: {str(e)}")
+        show_error(f"삭제 실패: {str(e)}")
+        return False
+
+def delete_test_cases_from_supabase(test_case_ids, chunk_size=500):
+    """
+    여러 테스트 케이스를 chunk_size개씩 묶어서 삭제 (대량 업로드 그룹도 요청 URL이 너무 길어지지 않게)
+    
+    Args:
+        test_case_ids (list): Supabase ID 리스트
+        chunk_size (int): 요청당 id 수
+    
+    Returns:
+        bool: 성공 여부
+    """
+    try:
+        supabase = get_supabase_client()
+        if not supabase:
+            return False
+        
+        for start in range(0, len(test_case_ids), chunk_size):
+            chunk = test_case_ids[start:start + chunk_size]
+            supabase.table('test_cases').delete().in_('id', chunk).execute()
+            notify_replica('test_cases', deleted_ids=chunk)
+        return True
+    
+    except Exception as e:
+        show_error(f"삭제 실패: {str(e)}")
         return False
 
 # =============================================
@@ -369,52 +1067,274 @@ def save_spec_doc_to_supabase(spec_doc):
             "embedding": str(embedding)
         }).execute()
         
+        notify_replica('spec_docs', inserted=result.data)
         return True
     
     except Exception as e:
-        st.error(f"기획 문서 저장 실패: {str(e)}")
+        show_error(f"기획 문서 저장 실패: {str(e)}")
         return False
 
 def load_spec_docs_from_supabase():
     """기획 문서 불러오기"""
     try:
-        supabase = get_supabase_client()
-        if not supabase:
+        replica = get_ready_replica('spec_docs')
+        if replica:
+            return replica.spec_docs()
+        
+        query = select_projection('spec_docs', 'detail')
+        if query is None:
             return []
         
-        result = supabase.table('spec_docs').select('*').order('id', desc=True).execute()
+        result = query.order('id', desc=True).execute()
         return result.data
     
     except Exception as e:
-        st.error(f"기획 문서 불러오기 실패: {str(e)}")
+        show_error(f"기획 문서 불러오기 실패: {str(e)}")
         return []
 
-def search_similar_spec_docs(query, limit=50, similarity_threshold=0.3):
+def match_spec_docs_rpc(query_embedding, limit=50, similarity_threshold=0.3):
+    """match_spec_docs RPC 벡터 검색 (similarity 포함 행 반환)"""
+    supabase = get_supabase_client()
+    if not supabase:
+        return []
+    
+    result = supabase.rpc(
+        'match_spec_docs',
+        {
+            'query_embedding': query_embedding,
+            'match_count': limit,
+            'similarity_threshold': similarity_threshold
+        }
+    ).execute()
+    return result.data
+
+def search_similar_spec_docs(query, limit=50, similarity_threshold=0.3, query_embedding=None):
     """기획 문서 벡터 검색"""
     try:
-        supabase = get_supabase_client()
-        if not supabase:
-            return []
-        
         # 검색어 임베딩
-        query_embedding = genai.embed_content(
-            model="models/text-embedding-004",
-            content=query,
-            task_type="retrieval_query"
-        )['embedding']
+        if query_embedding is None:
+            query_embedding = embed_query(query)
         
         # 벡터 검색
-        result = supabase.rpc(
-            'match_spec_docs',
-            {
-                'query_embedding': query_embedding,
-                'match_count': limit,
-                'similarity_threshold': similarity_threshold
-            }
-        ).execute()
-        
-        return result.data
+        return match_spec_docs_rpc(query_embedding, limit, similarity_threshold)
     
     except Exception as e:
-        st.error(f"기획 문서 검색 실패: {str(e)}")
+        show_error(f"기획 문서 검색 실패: {str(e)}")
         return []
+
+# =============================================
+# 7-1. 통합 검색 (테스트 케이스 + 기획 문서)
+# =============================================
+
+def search_test_cases_and_spec_docs(query, case_limit=50, doc_limit=10, similarity_threshold=0.3):
+    """
+    검색어를 한 번만 임베딩하고 테스트 케이스/기획 문서 검색을 동시에 실행
+    - 기획 문서 RPC: 별도 스레드
+    - 테스트 케이스 하이브리드 검색(벡터 + 키워드): 현재 스레드
+    
+    Returns:
+        tuple: (테스트 케이스 리스트, 기획 문서 리스트)
+    """
+    try:
+        query_embedding = embed_query(query)
+    except Exception as e:
+        show_error(f"검색어 임베딩 실패: {str(e)}")
+        # 임베딩 없이 키워드 검색만 진행
+        return search_lexical_test_cases(query, limit=case_limit), []
+    
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        doc_future = executor.submit(match_spec_docs_rpc, query_embedding, doc_limit, similarity_threshold)
+        
+        test_cases = hybrid_search_test_cases(
+            query,
+            limit=case_limit,
+            similarity_threshold=similarity_threshold,
+            query_embedding=query_embedding
+        )
+        
+        try:
+            spec_docs = doc_future.result()
+        except Exception as e:
+            show_error(f"기획 문서 검색 실패: {str(e)}")
+            spec_docs = []
+    
+    return test_cases, spec_docs
+
+# =============================================
+# 8. 통계 함수 (서버 측 집계 + 짧은 TTL 캐시)
+# =============================================
+
+@st.cache_data(ttl=30, show_spinner=False)
+def count_rows(table_name, count="exact"):
+    """
+    테이블 행 개수 (서버 측 count, 데이터는 전송하지 않음)
+    
+    Args:
+        table_name (str): 테이블 이름
+        count (str): "exact" 또는 "estimated" (대용량이면 estimated 권장)
+    
+    Returns:
+        int: 행 개수 (실패 시 None)
+    """
+    try:
+        replica = get_ready_replica(table_name)
+        if replica:
+            return replica.count(table_name)
+        
+        query = select_projection(table_name, 'stats', count=count)
+        if query is None:
+            return None
+        
+        result = query.limit(1).execute()
+        return result.count
+    
+    except Exception as e:
+        show_error(f"개수 조회 실패: {str(e)}")
+        return None
+
+@st.cache_data(ttl=30, show_spinner=False)
+def get_category_stats():
+    """
+    test_cases 카테고리별 개수
+    
+    Supabase SQL Editor에서 아래 RPC를 생성해서 사용:
+        create or replace function test_case_category_stats()
+        returns table (category text, count bigint)
+        language sql stable as $$
+            select coalesce(nullif(category, ''), '미분류'), count(*) from test_cases group by 1
+        $$;
+    
+    Returns:
+        dict: {카테고리: 개수}
+    """
+    try:
+        replica = get_ready_replica('test_cases')
+        if replica:
+            return replica.category_stats()
+        
+        supabase = get_supabase_client()
+        if not supabase:
+            return {}
+        
+        try:
+            result = supabase.rpc('test_case_category_stats', {}).execute()
+            return {row['category']: row['count'] for row in result.data}
+        except Exception:
+            # RPC 미생성 시 category 컬럼만 페이지 단위로 조회해서 집계 (PostgREST 1000행 제한)
+            categories = {}
+            for page in iter_table_pages('test_cases', 'stats'):
+                for row in page:
+                    cat = row.get('category') or '미분류'
+                    categories[cat] = categories.get(cat, 0) + 1
+            return categories
+    
+    except Exception as e:
+        show_error(f"카테고리 통계 조회 실패: {str(e)}")
+        return {}
+
+# =============================================
+# 9. 전체 데이터 내보내기 (Parquet / JSONL)
+# =============================================
+
+EXPORT_DIR = os.environ.get("EXPORT_DIR", "exports")
+
+def export_table(table_name, fmt='parquet', include_embeddings=False, page_size=1000, on_page=None):
+    """
+    테이블 전체를 id 순서로 페이지 단위 조회하며 파일로 저장 (메모리에는 한 페이지만 유지)
+    
+    Args:
+        table_name (str): 'test_cases' 또는 'spec_docs'
+        fmt (str): 'parquet' 또는 'jsonl'
+        include_embeddings (bool): 임베딩(float32 배열) 포함 여부
+        page_size (int): 요청당 행 수
+        on_page (callable): 페이지 기록 후 호출 (누적 행 수)
+    
+    Returns:
+        dict: 저장 경로, 행 수, 파일 크기, 처리 속도 (export_pages 참고)
+    """
+    projection = 'search' if include_embeddings else 'export'
+    columns = PROJECTIONS[table_name][projection].split(', ')
+    path = os.path.join(EXPORT_DIR, f"{table_name}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{fmt}")
+    
+    return export_pages(
+        iter_table_pages(table_name, projection, page_size),
+        columns,
+        path,
+        fmt=fmt,
+        on_page=on_page
+    )
+
+# =============================================
+# 10. 로컬 복제본 (목록/통계/키워드 검색용)
+# =============================================
+
+def fetch_rows_by_id(table_name, ids):
+    """id 목록에 해당하는 행 조회 ('detail' 컬럼)"""
+    query = select_projection(table_name, 'detail')
+    if query is None:
+        raise RuntimeError("Supabase 연결 실패")
+    return query.in_('id', list(ids)).execute().data
+
+def fetch_table_pages(table_name, projection, after_id):
+    """복제본 동기화용 페이지 조회 (연결 실패는 예외로 → 동기화 상태에 기록)"""
+    if get_supabase_client() is None:
+        raise RuntimeError("Supabase 연결 실패")
+    return iter_table_pages(table_name, projection, after_id=after_id)
+
+@st.cache_resource
+def get_local_replica():
+    """
+    로컬 복제본 (SQLite, 백그라운드 동기화 스레드 1개)
+    - LOCAL_REPLICA_SYNC_SECONDS마다 새 행/수정된 행 반영
+    - LOCAL_REPLICA_RECONCILE_SECONDS마다 서버 전체와 비교 (늦게 커밋된 행, 다른 곳에서 수정/삭제된 행)
+    
+    Returns:
+        LocalReplica: 복제본 (LOCAL_REPLICA=0이거나 파일을 열 수 없으면 None)
+    """
+    if not LOCAL_REPLICA:
+        return None
+    
+    try:
+        replica = LocalReplica(
+            os.environ.get("LOCAL_REPLICA_PATH", ".cache/replica.sqlite3"),
+            fetch_table_pages,
+            fetch_rows_by_id
+        )
+    except Exception as e:
+        show_warning(f"로컬 복제본 사용 불가, Supabase에서 직접 조회합니다: {str(e)}")
+        return None
+    
+    replica.start(
+        interval_seconds=int(os.environ.get("LOCAL_REPLICA_SYNC_SECONDS", "30")),
+        reconcile_seconds=int(os.environ.get("LOCAL_REPLICA_RECONCILE_SECONDS", "600"))
+    )
+    return replica
+
+def get_ready_replica(table_name):
+    """첫 동기화가 끝난 복제본 (아직이면 None → Supabase에서 직접 조회)"""
+    replica = get_local_replica()
+    if replica and replica.is_ready(table_name):
+        return replica
+    return None
+
+def notify_replica(table_name, updates=None, deleted_ids=(), inserted=()):
+    """
+    Supabase에 쓴 뒤 복제본에 알림 (rerun 직후 목록에 바로 보이도록 복제본에 먼저 반영)
+    
+    Args:
+        table_name (str): 'test_cases' 또는 'spec_docs'
+        updates (dict): {id: 수정한 컬럼} - 복제본에 바로 반영하고 다음 동기화에서 다시 조회
+        deleted_ids (list): 삭제된 행 id (복제본에서 즉시 제거)
+        inserted (list): insert 응답 행 (.execute().data) - 복제본에 바로 추가
+    """
+    replica = get_local_replica()
+    if not replica:
+        return
+    if deleted_ids:
+        replica.mark_deleted(table_name, deleted_ids)
+    if inserted:
+        replica.upsert_rows(table_name, inserted)
+    # dirty 표시가 먼저 → 진행 중인 동기화가 수정 전 조회 결과로 patch를 덮어쓰지 않음
+    replica.mark_changed(table_name, list(updates or {}))
+    for row_id, fields in (updates or {}).items():
+        replica.patch_row(table_name, row_id, fields)
@@ -0,0 +1,130 @@
+# table_rows.py
+"""
+표 형식 테스트 케이스 DataFrame ↔ 행(dict) 변환
+- 컬럼 단위(벡터) 연산으로 정리/필터링 (iterrows로 한 행씩 돌지 않음)
+- 표 형식 저장, 표 그룹 수정, CSV/Excel 업로드가 같은 규칙을 사용
+- 대용량 CSV/Excel은 묶음(chunk) 단위로 읽어서 메모리 사용량을 일정하게 유지
+"""
+
+from itertools import islice
+
+import pandas as pd
+
+try:
+    import openpyxl
+    OPENPYXL_AVAILABLE = True
+except ImportError:
+    OPENPYXL_AVAILABLE = False
+
+TABLE_COLUMNS = ['NO', 'CATEGORY', 'DEPTH 1', 'DEPTH 2', 'DEPTH 3', 'PRE-CONDITION', 'STEP', 'EXPECT RESULT']
+
+# 비어 있으면 유효하지 않은 행으로 보는 컬럼
+REQUIRED_COLUMNS = ['CATEGORY', 'DEPTH 1']
+
+
+def missing_columns(df, columns=TABLE_COLUMNS):
+    """DataFrame에 없는 표 컬럼 목록"""
+    return [col for col in columns if col not in df.columns]
+
+
+def _clean_column(col):
+    """NaN/None → '', 정수로만 된 실수 컬럼(1.0, 2.0 ...)은 정수 문자열로"""
+    if pd.api.types.is_float_dtype(col):
+        values = col.dropna()
+        if (values == values.round()).all():
+            col = col.astype('Int64')
+    return col.astype(object).where(col.notna(), '').astype(str)
+
+
+def clean_table_frame(df, columns=TABLE_COLUMNS):
+    """
+    표 컬럼만 남기고 모든 값을 문자열로 정리
+
+    Args:
+        df (DataFrame): 원본 표 (CSV/Excel, data_editor 결과 등)
+        columns (list): 남길 컬럼
+
+    Returns:
+        DataFrame: 문자열 값만 있는 표 (인덱스는 0부터 다시 매김)
+
+    Raises:
+        ValueError: 필요한 컬럼이 없을 때
+    """
+    missing = missing_columns(df, columns)
+    if missing:
+        raise ValueError(f"컬럼이 없습니다: {', '.join(missing)}")
+
+    return pd.DataFrame({col: _clean_column(df[col]) for col in columns}).reset_index(drop=True)
+
+
+def blank_mask(frame, columns=REQUIRED_COLUMNS):
+    """컬럼별 '비어 있음'(공백만 있는 값 포함) 여부"""
+    return pd.DataFrame({col: frame[col].str.strip() == '' for col in columns})
+
+
+def table_rows_from_frame(df, keep_positions=False):
+    """
+    표 DataFrame → 저장용 행 리스트
+
+    Args:
+        df (DataFrame): 표
+        keep_positions (bool):
+            False - CATEGORY / DEPTH 1 중 하나라도 빈 행은 제외 (새로 저장)
+            True - 행 위치 유지, 둘 다 빈 행은 None (표 그룹 수정: None = 삭제 대상)
+
+    Returns:
+        list: {컬럼: 문자열} 행 리스트
+    """
+    frame = clean_table_frame(df)
+    blank = blank_mask(frame)
+
+    if not keep_positions:
+        return frame[~blank.any(axis=1)].to_dict('records')
+
+    records = frame.to_dict('records')
+    return [None if is_blank else row for row, is_blank in zip(records, blank.all(axis=1).tolist())]
+
+
+def _iter_xlsx_frames(file, chunksize):
+    """xlsx 첫 시트를 read-only 모드로 한 묶음씩 읽음 (첫 행 = 컬럼명)"""
+    if not OPENPYXL_AVAILABLE:
+        raise ImportError("Excel 파일을 읽으려면 openpyxl이 필요합니다: pip install openpyxl")
+
+    workbook = openpyxl.load_workbook(file, read_only=True, data_only=True)
+    try:
+        rows = workbook.worksheets[0].iter_rows(values_only=True)
+        header = [str(value).strip() if value is not None else '' for value in next(rows, ())]
+        while True:
+            batch = list(islice(rows, chunksize))
+            if not batch:
+                break
+            width = len(header)
+            yield pd.DataFrame([tuple(row[:width]) + (None,) * (width - len(row)) for row in batch], columns=header)
+    finally:
+        workbook.close()
+
+
+def iter_table_chunks(file, filename, chunksize=1000):
+    """
+    CSV/xlsx 파일을 chunksize행씩 읽어서 정리된 표로 돌려줌
+    (파일 전체를 DataFrame으로 올리지 않음)
+
+    Args:
+        file: 업로드된 파일 객체
+        filename (str): 파일 이름 (확장자로 형식 판단)
+        chunksize (int): 묶음당 행 수
+
+    Yields:
+        DataFrame: clean_table_frame으로 정리된 묶음
+
+    Raises:
+        ValueError: 필요한 컬럼이 없을 때 (첫 묶음에서 발생)
+    """
+    file.seek(0)
+    if filename.lower().endswith('.csv'):
+        frames = pd.read_csv(file, chunksize=chunksize, dtype=str)
+    else:
+        frames = _iter_xlsx_frames(file, chunksize)
+
+    for frame in frames:
+        yield clean_table_frame(frame)
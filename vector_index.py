@@ -0,0 +1,142 @@
+# vector_index.py
+"""
+로컬 벡터 인덱스 (match_test_cases RPC 대체용)
+- flat: NumPy 전체 코사인 유사도 계산 (정확)
+- ivf: k-means 클러스터 중 가까운 nprobe개만 탐색 (근사)
+- hnsw: hnswlib 그래프 인덱스 (근사, hnswlib 설치 필요)
+"""
+
+import json
+
+import numpy as np
+
+try:
+    import hnswlib
+    HNSW_AVAILABLE = True
+except ImportError:
+    HNSW_AVAILABLE = False
+
+
+def parse_embedding(value):
+    """pgvector 값(문자열 "[0.1, ...]" 또는 리스트)을 float32 배열로 변환"""
+    if isinstance(value, str):
+        value = json.loads(value)
+    return np.asarray(value, dtype=np.float32)
+
+
+class VectorIndex:
+    """
+    test_cases 스냅샷으로 만드는 인메모리 벡터 인덱스
+
+    Args:
+        mode (str): 'flat', 'ivf', 'hnsw'
+        nlist (int): ivf 클러스터 수 (None이면 sqrt(N))
+        nprobe (int): ivf 검색 시 탐색할 클러스터 수
+        ef (int): hnsw 검색 폭
+
+    Raises:
+        ImportError: hnsw인데 hnswlib이 설치되지 않았을 때 (flat으로 조용히 바뀌지 않도록)
+    """
+
+    def __init__(self, mode='flat', nlist=None, nprobe=8, ef=100):
+        if mode == 'hnsw' and not HNSW_AVAILABLE:
+            raise ImportError("VECTOR_INDEX_MODE=hnsw를 사용하려면 hnswlib이 필요합니다: pip install hnswlib")
+        self.mode = mode
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self.ef = ef
+        self.rows = []
+        self.vectors = np.zeros((0, 0), dtype=np.float32)
+        self._centroids = None
+        self._assignments = None
+        self._hnsw = None
+
+    def build(self, rows):
+        """
+        인덱스 생성
+
+        Args:
+            rows (list): embedding 컬럼이 포함된 test_cases 행 리스트
+        """
+        rows = [row for row in rows if row.get('embedding')]
+        self.rows = [{k: v for k, v in row.items() if k != 'embedding'} for row in rows]
+
+        if not rows:
+            self.vectors = np.zeros((0, 0), dtype=np.float32)
+            return self
+
+        vectors = np.stack([parse_embedding(row['embedding']) for row in rows])
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        self.vectors = vectors / np.maximum(norms, 1e-12)
+
+        if self.mode == 'ivf':
+            self._build_ivf()
+        elif self.mode == 'hnsw':
+            self._build_hnsw()
+
+        return self
+
+    def search(self, query_embedding, limit=50, similarity_threshold=0.3):
+        """
+        코사인 유사도 검색
+
+        Returns:
+            list: (행, 유사도) 튜플 리스트 (유사도 내림차순)
+        """
+        if not self.rows:
+            return []
+
+        query = np.asarray(query_embedding, dtype=np.float32)
+        query = query / max(np.linalg.norm(query), 1e-12)
+
+        if self.mode == 'hnsw':
+            k = min(limit, len(self.rows))
+            self._hnsw.set_ef(max(self.ef, k))
+            labels, distances = self._hnsw.knn_query(query, k=k)
+            candidates = zip(labels[0], 1.0 - distances[0])
+        else:
+            if self.mode == 'ivf':
+                candidate_ids = self._ivf_candidates(query)
+            else:
+                candidate_ids = np.arange(len(self.rows))
+
+            scores = self.vectors[candidate_ids] @ query
+            top = np.argsort(-scores)[:limit]
+            candidates = zip(candidate_ids[top], scores[top])
+
+        return [
+            (self.rows[i], float(score))
+            for i, score in candidates
+            if score >= similarity_threshold
+        ]
+
+    def _build_ivf(self, iterations=10):
+        """k-means로 클러스터 생성"""
+        n = len(self.vectors)
+        nlist = min(self.nlist or max(1, int(np.sqrt(n))), n)
+
+        rng = np.random.default_rng(0)
+        centroids = self.vectors[rng.choice(n, nlist, replace=False)]
+
+        for _ in range(iterations):
+            assignments = np.argmax(self.vectors @ centroids.T, axis=1)
+            for c in range(nlist):
+                members = self.vectors[assignments == c]
+                if len(members):
+                    centroid = members.mean(axis=0)
+                    centroids[c] = centroid / max(np.linalg.norm(centroid), 1e-12)
+
+        self._centroids = centroids
+        self._assignments = np.argmax(self.vectors @ centroids.T, axis=1)
+
+    def _ivf_candidates(self, query):
+        """가장 가까운 nprobe개 클러스터의 행 번호"""
+        nearest = np.argsort(-(self._centroids @ query))[:self.nprobe]
+        return np.flatnonzero(np.isin(self._assignments, nearest))
+
+    def _build_hnsw(self):
+        """hnswlib 그래프 인덱스 생성"""
+        n, dim = self.vectors.shape
+        self._hnsw = hnswlib.Index(space='cosine', dim=dim)
+        self._hnsw.init_index(max_elements=n, ef_construction=200, M=16)
+        self._hnsw.add_items(self.vectors, np.arange(n))